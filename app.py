@@ -7,10 +7,14 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 import numpy as np
 
+from geo_validation import validate_coordinates, format_report
+from data_cleaning import clean_dataset, duplicate_mask, format_report as format_clean_report
+from features import DATA_PATH, FEATURE_COLS, TARGET_COL
+
 print("📌 app.py is running...\n")
 
 # 1️⃣ LOAD DATA
-data = pd.read_csv("house_prices.csv")
+data = pd.read_csv(DATA_PATH)
 print("✅ Data Loaded Successfully!\n")
 
 print("🔹 First 5 rows of data:")
@@ -19,29 +23,34 @@ print(data.head(), "\n")
 print("🔹 Columns in dataset:")
 print(list(data.columns), "\n")
 
+# 1b. FIX SWAPPED / OUT-OF-INDIA COORDINATES
+data, coord_report = validate_coordinates(data, drop_invalid=True)
+print("🧭 Coordinate check:", format_report(coord_report), "\n")
+
+# 1c. DROP DUPLICATE LISTINGS (before the split, so none lands in both parts)
+dup = duplicate_mask(data, list(data.columns))
+data = data[~dup]
+print(f"🧹 Dropped {int(dup.sum())} duplicate listings\n")
+
 # 2️⃣ SELECT FEATURES & TARGET
-target_col = "TARGET(PRICE_IN_LACS)"
+# shared with train_model.py and the app (features.py)
+target_col = TARGET_COL
+feature_cols = FEATURE_COLS
 
-feature_cols = [
-    "POSTED_BY",
-    "UNDER_CONSTRUCTION",
-    "RERA",
-    "BHK_NO.",
-    "BHK_OR_RK",
-    "SQUARE_FT",
-    "READY_TO_MOVE",
-    "RESALE",
-    "LONGITUDE",
-    "LATITUDE",
-]
+# 2b. TRAIN–TEST SPLIT, then clean per-city outliers out of the training
+# part only; the test set keeps every row so the scores stay comparable
+train_data, test_data = train_test_split(data, test_size=0.2, random_state=42)
+train_data, clean_report = clean_dataset(train_data)
+print("🧹 Cleaning (train only):", format_clean_report(clean_report), "\n")
 
 # keep only needed columns and drop rows with missing values
-data_model = data[feature_cols + [target_col]].dropna()
+train_data = train_data[feature_cols + [target_col]].dropna()
+test_data = test_data[feature_cols + [target_col]].dropna()
 
-X = data_model[feature_cols]
-y = data_model[target_col]
+X_train, y_train = train_data[feature_cols], train_data[target_col]
+X_test, y_test = test_data[feature_cols], test_data[target_col]
 
-print("✅ Data prepared for modelling. Rows:", len(X), "\n")
+print("✅ Data prepared for modelling. Train rows:", len(X_train), " Test rows:", len(X_test), "\n")
 
 # 3️⃣ DEFINE NUMERIC & CATEGORICAL COLUMNS
 numeric_features = [
@@ -81,11 +90,7 @@ regressor = Pipeline(steps=[
     ("model", model),
 ])
 
-# 7️⃣ TRAIN–TEST SPLIT
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
-
+# 7️⃣ TRAIN
 print("🚀 Training the model...")
 regressor.fit(X_train, y_train)
 
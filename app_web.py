@@ -1,14 +1,33 @@
 import streamlit as st
 import pandas as pd
-import joblib
-import sqlite3
-import hashlib
+import altair as alt
 import json
+import os
 from datetime import datetime, timedelta
 import random
 import string
 import time
 
+from auth_db import (
+    authenticate_user,
+    create_user,
+    get_conn,
+    get_user_by_email,
+    get_user_logs,
+    init_db,
+    log_batch_prediction,
+    log_prediction,
+    reset_user_password,
+)
+from batch_pricing import attach_results, batch_summary, score_in_chunks, validate_batch
+from drift_monitor import SOURCES, drift_report, load_profile
+from explainer import PathExplainer, contributions_for_chart
+from features import BHK_OR_RK_CODES, POSTED_BY_CODES
+from geo_validation import validate_coordinates
+from model_manager import CANARY_PATH, MODEL_PATH, ModelManager
+from price_surface import SURFACE_PATH, PriceSurface
+from sensitivity import flag_label, sweep
+
 # ===================== BASIC CONFIG =====================
 
 st.set_page_config(
@@ -17,127 +36,41 @@ st.set_page_config(
     layout="wide"
 )
 
-DB_PATH = "auth_logs.db"
 APP_TITLE = "Smart House Price Predictor"
-PASSWORD_SALT = "some_static_salt_change_me"  # demo only
-
-
-# ===================== DB HELPERS =======================
-
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-def init_db():
-    with get_conn() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS audit_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                ts TEXT NOT NULL,
-                price_lacs REAL NOT NULL,
-                city TEXT,
-                area TEXT,
-                payload TEXT
-            )
-            """
-        )
-        conn.commit()
-
-
-def hash_password(password: str) -> str:
-    data = (PASSWORD_SALT + password).encode("utf-8")
-    return hashlib.sha256(data).hexdigest()
-
-
-def create_user(username: str, email: str, password: str):
-    try:
-        with get_conn() as conn:
-            conn.execute(
-                "INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
-                (username, email, hash_password(password), datetime.utcnow().isoformat()),
-            )
-            conn.commit()
-        return True, "Account created successfully. You can login now."
-    except sqlite3.IntegrityError:
-        return False, "Username or email already exists."
-
-
-def authenticate_user(username: str, password: str) -> bool:
-    with get_conn() as conn:
-        cur = conn.execute(
-            "SELECT password_hash FROM users WHERE username = ?",
-            (username,),
-        )
-        row = cur.fetchone()
-    if not row:
-        return False
-    return row["password_hash"] == hash_password(password)
+# registration is open, so nobody is an admin unless named here explicitly
+# (comma-separated usernames, e.g. HOUSE_APP_ADMINS=alice,bob)
+ADMIN_USERS = {u.strip() for u in os.environ.get("HOUSE_APP_ADMINS", "").split(",") if u.strip()}
 
 
-def get_user_by_email(username: str, email: str):
-    with get_conn() as conn:
-        cur = conn.execute(
-            "SELECT * FROM users WHERE username = ? AND email = ?",
-            (username, email),
-        )
-        return cur.fetchone()
+# ===================== MODEL LOADING ====================
 
+@st.cache_resource
+def get_model_manager():
+    # one manager per server process; it hot-swaps new artifacts in the background
+    return ModelManager(MODEL_PATH, canary_path=CANARY_PATH).start()
 
-def reset_user_password(username: str, new_password: str):
-    with get_conn() as conn:
-        conn.execute(
-            "UPDATE users SET password_hash = ? WHERE username = ?",
-            (hash_password(new_password), username),
-        )
-        conn.commit()
 
+def load_model():
+    return get_model_manager().get()
 
-def log_prediction(username: str, price_lacs: float, city: str, area: str, payload: dict):
-    with get_conn() as conn:
-        conn.execute(
-            "INSERT INTO audit_logs (username, ts, price_lacs, city, area, payload) VALUES (?, ?, ?, ?, ?, ?)",
-            (
-                username,
-                datetime.utcnow().isoformat(),
-                price_lacs,
-                city,
-                area,
-                json.dumps(payload),
-            ),
-        )
-        conn.commit()
 
+@st.cache_resource(max_entries=2)
+def get_explainer(model_key: int, _model):
+    # keyed by id(model); the explainer holds the model, so the id stays unique while cached
+    return PathExplainer(_model)
 
-def get_user_logs(username: str):
-    with get_conn() as conn:
-        cur = conn.execute(
-            "SELECT ts, price_lacs, city, area, payload FROM audit_logs "
-            "WHERE username = ? ORDER BY ts DESC LIMIT 50",
-            (username,),
-        )
-        return cur.fetchall()
 
+@st.cache_resource(max_entries=2)
+def get_price_surface(mtime: float):
+    # keyed by file mtime, so a rebuilt surface is picked up without a restart
+    return PriceSurface.load(SURFACE_PATH)
 
-# ===================== MODEL LOADING ====================
 
-@st.cache_resource
-def load_model():
-    return joblib.load("house_price_model.pkl")
+def load_price_surface():
+    try:
+        return get_price_surface(os.path.getmtime(SURFACE_PATH))
+    except (OSError, ValueError):
+        return None
 
 
 # ===================== UTIL HELPERS =====================
@@ -234,6 +167,10 @@ if "username" not in st.session_state:
     st.session_state.username = None
 if "auth_view" not in st.session_state:
     st.session_state.auth_view = "login"  # login | register | forgot
+if "last_feature_row" not in st.session_state:
+    st.session_state.last_feature_row = None  # base for the what-if panel
+if "batch_result" not in st.session_state:
+    st.session_state.batch_result = None  # last priced upload, for download
 
 init_db()
 
@@ -521,53 +458,117 @@ def forgot_password_view():
     st.markdown("</div>", unsafe_allow_html=True)
 
 
-# ===================== MAIN APP (AFTER LOGIN) ==========
+# ===================== WHAT-IF PANEL ====================
 
-def main_app():
-    model = load_model()
+def show_sensitivity_panel(model, base_row: dict):
+    """Response curves around the last prediction, scored as one batch."""
+    results, elapsed_ms = sweep(model, base_row)
+    base_bhk = int(base_row["BHK_NO."])
+    base_flags = (results["READY_TO_MOVE"] == base_row["READY_TO_MOVE"]) & (
+        results["RESALE"] == base_row["RESALE"]
+    )
 
-    # Sidebar with compact toggle
-    with st.sidebar:
-        compact = st.checkbox("Compact sidebar", value=False)
-        st.markdown("### 👋 Welcome")
-        st.write(f"Logged in as **{st.session_state.username}**")
-        st.markdown("---")
-        if not compact:
-            st.markdown("### ℹ️ About this app")
-            st.write(
-                """
-                • ML stack: **Streamlit + scikit-learn**  
-                • Model: Random Forest Regressor  
-                • Target: Price in **₹ Lacs**  
-                • Auth: SQLite users, custom reset, audit logs
-                """
-            )
-            st.markdown("---")
-        if st.button("Logout"):
-            st.session_state.logged_in = False
-            st.session_state.username = None
-            st.rerun()
-        st.caption("Portfolio Project · ML · Real Estate")
+    st.markdown("#### 📐 Price vs size for each BHK")
+    by_bhk = results[base_flags].pivot(index="SQUARE_FT", columns="BHK_NO.", values="PRICE_LACS")
+    by_bhk.columns = [f"{c} BHK" for c in by_bhk.columns]
+    st.line_chart(by_bhk)
+
+    st.markdown(f"#### 🏗️ Price vs size by status ({base_bhk} BHK)")
+    same_bhk = results[results["BHK_NO."] == base_bhk].copy()
+    same_bhk["Status"] = same_bhk.apply(flag_label, axis=1)
+    st.line_chart(same_bhk.pivot(index="SQUARE_FT", columns="Status", values="PRICE_LACS"))
+
+    st.caption(f"{len(results)} scenarios priced in one batch · {elapsed_ms:.0f} ms")
+
+
+# ===================== DRIFT PANEL ======================
+
+def show_drift_panel():
+    """Live input distribution vs the training profile saved with the model."""
+    profile = load_profile()
+    if profile is None:
+        st.info("No training profile found. Run train_model.py to create one.")
+        return
+    source = st.radio(
+        "Inputs",
+        list(SOURCES),
+        format_func=lambda s: "Interactive predictions" if s == "live" else "Portfolio uploads",
+        horizontal=True,
+        key="drift_source",
+    )
+    with get_conn() as conn:
+        report = drift_report(conn, profile, source)
+    if report["Live rows"].max() == 0:
+        st.write("No predictions recorded against the current training profile yet.")
+        return
+    st.dataframe(
+        report.style.format({"PSI": "{:.3f}", "KS": "{:.3f}"}, na_rep="–"),
+        use_container_width=True,
+        hide_index=True,
+    )
+    st.caption(
+        f"Reference: {profile['rows']:,} training rows · profile {profile['id']} · "
+        "PSI < 0.1 stable, 0.1–0.25 moderate, ≥ 0.25 drift. KS shown for numeric features."
+    )
 
-    show_top_info_bar()
 
-    st.markdown('<div class="main-wrapper">', unsafe_allow_html=True)
+# ===================== PRICE HEATMAP ====================
+
+def show_price_heatmap():
+    """Precomputed typical prices over each city's grid; no model calls."""
+    surface = load_price_surface()
+    if surface is None:
+        st.info("No price surface found. Run price_surface.py (or train_model.py) to build it.")
+        return
+
+    last = st.session_state.last_feature_row
+    last_city = surface.city_at(last["LONGITUDE"], last["LATITUDE"]) if last else None
+    h1, h2 = st.columns(2)
+    with h1:
+        city = st.selectbox(
+            "City",
+            range(len(surface.cities)),
+            index=last_city or 0,
+            format_func=lambda i: surface.cities[i],
+            key="heatmap_city",
+        )
+    with h2:
+        config = st.selectbox(
+            "Configuration",
+            range(len(surface.configs)),
+            index=surface.config_for(last["BHK_NO."]) if last else 1,
+            format_func=lambda i: surface.configs[i]["label"],
+            key="heatmap_config",
+        )
 
-    # Header
-    st.markdown(
-        """
-        <div class="header-card">
-            <div class="pill">Machine Learning · Real Estate</div>
-            <div class="header-title">🏠 Smart House Price Predictor</div>
-            <div class="header-sub">
-                Estimate the market value of residential properties using your trained ML model.
-                Enter details like city, locality, area and configuration to get an instant price in <b>₹ Lacs</b>.
-            </div>
-        </div>
-        """,
-        unsafe_allow_html=True,
+    frame = surface.heatmap_frame(city, config)
+    chart = alt.Chart(frame).mark_rect().encode(
+        x=alt.X("Longitude:Q", scale=alt.Scale(zero=False)),
+        x2="Longitude2:Q",
+        y=alt.Y("Latitude:Q", scale=alt.Scale(zero=False)),
+        y2="Latitude2:Q",
+        color=alt.Color("Price (Lacs):Q", scale=alt.Scale(scheme="viridis")),
+        tooltip=["Longitude", "Latitude", alt.Tooltip("Price (Lacs):Q", format=",.2f")],
     )
+    if last and last_city == city:
+        point = pd.DataFrame([{"Longitude": last["LONGITUDE"], "Latitude": last["LATITUDE"]}])
+        chart += alt.Chart(point).mark_point(color="white", size=120, filled=True).encode(
+            x="Longitude:Q", y="Latitude:Q"
+        )
+    st.altair_chart(chart, use_container_width=True)
+
+    current = get_model_manager().current
+    st.caption(
+        f"{surface.configs[config]['label']}, other inputs at their most common values · "
+        f"built {surface.meta['created_at']} UTC"
+    )
+    if current is not None and surface.model_sha256 not in (None, current.sha256):
+        st.caption("⚠️ Built for a different model version. Re-run price_surface.py to refresh it.")
+
+
+# ===================== MAIN APP (AFTER LOGIN) ==========
 
+def single_prediction_view(model):
     st.markdown('<div class="section-title">Property details</div>', unsafe_allow_html=True)
     st.markdown(
         '<div class="section-sub">City / country / area are shown in the summary. '
@@ -609,9 +610,10 @@ def main_app():
         return 1 if x == "Yes" else 0
 
     if submitted:
-         posted_by_map = {"Owner": 0, "Dealer": 1, "Builder": 2}
-         bhk_or_rk_map = {"BHK": 0, "RK": 1}
-    feature_row = {
+        # same category codes the model was trained with
+        posted_by_map = POSTED_BY_CODES
+        bhk_or_rk_map = BHK_OR_RK_CODES
+        feature_row = {
             "POSTED_BY": posted_by_map[posted_by],
             "UNDER_CONSTRUCTION": yn_to_int(under_construction),
             "RERA": yn_to_int(rera),
@@ -623,26 +625,37 @@ def main_app():
             "LONGITUDE": longitude,
             "LATITUDE": latitude,
         }
-    input_df = pd.DataFrame([feature_row])
-    price_lacs = float(model.predict(input_df)[0])
-    price_inr = price_lacs * 1_00_000
-    input_df = pd.DataFrame([feature_row])
-    price_lacs = float(model.predict(input_df)[0])
-    price_inr = price_lacs * 1_00_000
+        input_df = pd.DataFrame([feature_row])
+
+        # coordinate sanity check (same stage as training)
+        input_df, coord_report = validate_coordinates(input_df)
+        if coord_report["swapped"]:
+            st.warning("Longitude and latitude looked swapped, so they were corrected automatically.")
+        if coord_report["out_of_bounds"]:
+            st.warning("These coordinates are outside India. The estimate may be unreliable.")
+        input_df = input_df.drop(columns="COORD_VALID")
+        longitude = float(input_df["LONGITUDE"].iloc[0])
+        latitude = float(input_df["LATITUDE"].iloc[0])
+        feature_row["LONGITUDE"] = longitude
+        feature_row["LATITUDE"] = latitude
+
+        price_lacs = float(model.predict(input_df)[0])
+        price_inr = price_lacs * 1_00_000
 
         # log this prediction
-    log_prediction(
+        log_prediction(
             username=st.session_state.username,
             price_lacs=price_lacs,
             city=city,
             area=area_name,
             payload=feature_row,
         )
+        st.session_state.last_feature_row = feature_row
 
-    c1, c2 = st.columns([1.7, 1.3])
+        c1, c2 = st.columns([1.7, 1.3])
 
         # Animated price reveal
-    with c1:
+        with c1:
             metric_placeholder = st.empty()
             steps = 25
             for i in range(steps + 1):
@@ -667,7 +680,7 @@ def main_app():
                 )
                 time.sleep(0.02)
 
-    with c2:
+        with c2:
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.markdown('<div class="section-title">Property snapshot</div>', unsafe_allow_html=True)
             st.markdown(
@@ -704,10 +717,186 @@ def main_app():
                 """,
                 unsafe_allow_html=True,
             )
+            surface = load_price_surface()
+            typical = surface.lookup(longitude, latitude, bhk_no) if surface else None
+            if typical:
+                typical_city, typical_label, typical_price = typical
+                st.caption(f"Typical {typical_label} around here ({typical_city}): ₹ {typical_price:,.2f} Lacs")
+
+            explainer = get_explainer(id(model), model)
+            st.markdown('<div class="section-title" style="margin-top:0.9rem;">Why this price</div>',
+                        unsafe_allow_html=True)
+            st.bar_chart(contributions_for_chart(explainer, input_df))
+            st.caption(
+                f"Typical listing: ₹ {explainer.bias:,.2f} Lacs. "
+                "Bars show how much each input moved this estimate up or down."
+            )
             st.markdown("</div>", unsafe_allow_html=True)
 
             st.success("Prediction generated successfully ✅")
 
+
+def batch_pricing_view(model):
+    """Price a whole CSV in chunks, with progress, cancel and download."""
+    st.markdown('<div class="section-title">Portfolio pricing</div>', unsafe_allow_html=True)
+    st.markdown(
+        '<div class="section-sub">Upload a CSV with the same columns as house_prices.csv '
+        '(POSTED_BY, BHK_OR_RK, SQUARE_FT, LONGITUDE, LATITUDE, ...). '
+        'Every valid row gets a price; invalid rows are kept with the reason.</div>',
+        unsafe_allow_html=True,
+    )
+    uploaded = st.file_uploader("Portfolio CSV", type=["csv"], key="batch_upload")
+    if uploaded is None:
+        st.session_state.batch_result = None
+        return
+
+    file_key = f"{uploaded.name}:{uploaded.size}"
+    result = st.session_state.batch_result
+    if result and result["file_key"] != file_key:
+        result = st.session_state.batch_result = None
+
+    b1, b2 = st.columns(2)
+    with b1:
+        start = st.button("🚀 Price portfolio", use_container_width=True)
+    with b2:
+        # clicking this reruns the script, which stops a scoring loop in progress
+        cancel = st.button("✖ Cancel", use_container_width=True)
+
+    if cancel:
+        st.info("Batch pricing cancelled. Nothing was logged.")
+        return
+    if start:
+        try:
+            df = pd.read_csv(uploaded)
+            X, status, report = validate_batch(df)
+        except (ValueError, pd.errors.ParserError) as exc:
+            st.error(f"Could not price this file: {exc}")
+            return
+
+        valid = status == "ok"
+        total = int(valid.sum())
+        progress = st.progress(0.0, text=f"Pricing {total:,} rows…")
+        t0 = time.perf_counter()
+        for done, prices in score_in_chunks(model, X, valid):
+            progress.progress(done / max(total, 1), text=f"Priced {done:,} of {total:,} rows")
+        elapsed = time.perf_counter() - t0
+
+        summary = batch_summary(uploaded.name, prices, report, elapsed)
+        log_batch_prediction(st.session_state.username, summary, X[valid])
+        priced = attach_results(df, prices, status)
+        result = st.session_state.batch_result = {
+            "file_key": file_key,
+            "file_name": uploaded.name,
+            "csv": priced.to_csv(index=False).encode("utf-8"),
+            "preview": priced.head(20),
+            "summary": summary,
+            "report": report,
+        }
+        del df, X, priced
+
+    if result:
+        summary, report = result["summary"], result["report"]
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Rows priced", f"{summary['priced']:,}")
+        m2.metric("Invalid rows", f"{summary['invalid']:,}")
+        m3.metric("Median price", f"₹ {summary['median_price_lacs'] or 0:,.2f} L")
+        m4.metric("Time", f"{summary['elapsed_s']:.2f}s")
+        if report["reasons"]:
+            st.caption("Invalid rows: " + ", ".join(f"{k} ({v:,})" for k, v in report["reasons"].items()))
+        if report["swapped_coords"]:
+            st.caption(f"{report['swapped_coords']:,} rows had longitude/latitude swapped and were corrected.")
+        st.dataframe(result["preview"], use_container_width=True)
+        st.download_button(
+            "⬇ Download priced portfolio",
+            result["csv"],
+            file_name=result["file_name"].rsplit(".", 1)[0] + "_priced.csv",
+            mime="text/csv",
+        )
+
+
+def main_app():
+    model = load_model()
+
+    # Sidebar with compact toggle
+    with st.sidebar:
+        compact = st.checkbox("Compact sidebar", value=False)
+        st.markdown("### 👋 Welcome")
+        st.write(f"Logged in as **{st.session_state.username}**")
+        st.markdown("---")
+        if not compact:
+            st.markdown("### ℹ️ About this app")
+            st.write(
+                """
+                • ML stack: **Streamlit + scikit-learn**  
+                • Model: Random Forest Regressor  
+                • Target: Price in **₹ Lacs**  
+                • Auth: SQLite users, custom reset, audit logs
+                """
+            )
+            st.markdown("---")
+        if not compact:
+            manager = get_model_manager()
+            info = manager.status()
+            st.caption(f"Model version `{info['current']}` · loaded {info['loaded_at']} UTC")
+            if info["last_error"]:
+                st.caption(f"⚠️ Last reload rejected: {info['last_error']}")
+            # the manager is shared by every session, so a rollback affects all users
+            is_admin = st.session_state.username in ADMIN_USERS
+            if is_admin and info["previous"] and st.button(f"↩️ Roll back to {info['previous']}"):
+                manager.rollback()
+                st.rerun()
+        if st.button("Logout"):
+            st.session_state.logged_in = False
+            st.session_state.username = None
+            st.session_state.last_feature_row = None
+            st.session_state.batch_result = None
+            st.rerun()
+        st.caption("Portfolio Project · ML · Real Estate")
+
+    show_top_info_bar()
+
+    st.markdown('<div class="main-wrapper">', unsafe_allow_html=True)
+
+    # Header
+    st.markdown(
+        """
+        <div class="header-card">
+            <div class="pill">Machine Learning · Real Estate</div>
+            <div class="header-title">🏠 Smart House Price Predictor</div>
+            <div class="header-sub">
+                Estimate the market value of residential properties using your trained ML model.
+                Enter details like city, locality, area and configuration to get an instant price in <b>₹ Lacs</b>.
+            </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    tab_single, tab_batch = st.tabs(["🔮 Single property", "📁 Portfolio upload"])
+    with tab_single:
+        single_prediction_view(model)
+    with tab_batch:
+        batch_pricing_view(model)
+
+    # ============ What-if sensitivity ============
+
+    if st.session_state.last_feature_row:
+        st.markdown("<br/>", unsafe_allow_html=True)
+        with st.expander("🧪 What-if: how price moves with size, BHK and status"):
+            show_sensitivity_panel(model, st.session_state.last_feature_row)
+
+    # ============ Price heatmap ============
+
+    st.markdown("<br/>", unsafe_allow_html=True)
+    with st.expander("🗺️ Typical prices by location (heatmap)"):
+        show_price_heatmap()
+
+    # ============ Input drift (admins) ============
+
+    if st.session_state.username in ADMIN_USERS:
+        with st.expander("🛰️ Input drift monitor (admin)"):
+            show_drift_panel()
+
     # ============ History + Charts ============
 
     st.markdown("<br/>", unsafe_allow_html=True)
@@ -716,11 +905,22 @@ def main_app():
         if not rows:
             st.write("No predictions logged yet. Make a few predictions to see trends over time.")
         else:
-            records = []
+            records, uploads = [], []
             for r in rows:
                 payload = json.loads(r["payload"])
                 ts_utc = datetime.fromisoformat(r["ts"])
                 ts_ist = ts_utc + timedelta(hours=5, minutes=30)
+                if payload.get("batch"):
+                    # one summary row per portfolio upload; kept out of the per-property charts
+                    uploads.append(
+                        {
+                            "Time (IST)": ts_ist,
+                            "File": payload.get("file"),
+                            "Rows priced": payload.get("priced"),
+                            "Median price (Lacs)": payload.get("median_price_lacs"),
+                        }
+                    )
+                    continue
                 records.append(
                     {
                         "Time (IST)": ts_ist,
@@ -731,33 +931,40 @@ def main_app():
                         "Sq Ft": payload.get("SQUARE_FT"),
                     }
                 )
-            df = pd.DataFrame(records).sort_values("Time (IST)")
+            if uploads:
+                st.markdown("#### 📁 Portfolio uploads")
+                st.dataframe(pd.DataFrame(uploads).sort_values("Time (IST)"), use_container_width=True)
 
-            st.dataframe(df, use_container_width=True)
+            if not records:
+                st.write("No single-property predictions logged yet.")
+            else:
+                df = pd.DataFrame(records).sort_values("Time (IST)")
 
-            # Download as CSV
-            csv = df.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                "⬇ Download history as CSV",
-                csv,
-                file_name="house_price_history.csv",
-                mime="text/csv",
-            )
+                st.dataframe(df, use_container_width=True)
 
-            if len(df) > 1:
-                st.markdown("#### 📈 Price over time")
-                chart_df = df[["Time (IST)", "Price (Lacs)"]].set_index("Time (IST)")
-                st.line_chart(chart_df)
-            else:
-                st.info("Add more predictions to see the price trend over time 📈")
+                # Download as CSV
+                csv = df.to_csv(index=False).encode("utf-8")
+                st.download_button(
+                    "⬇ Download history as CSV",
+                    csv,
+                    file_name="house_price_history.csv",
+                    mime="text/csv",
+                )
 
-            st.markdown("#### 🏙️ Average price by city (in your history)")
-            city_stats = df.groupby("City", dropna=True)["Price (Lacs)"].mean().reset_index()
-            if not city_stats.empty and len(city_stats) > 0:
-                city_stats = city_stats.rename(columns={"Price (Lacs)": "Avg Price (Lacs)"})
-                st.bar_chart(city_stats.set_index("City"))
-            else:
-                st.info("Make predictions for different cities to compare average prices 🏙️")
+                if len(df) > 1:
+                    st.markdown("#### 📈 Price over time")
+                    chart_df = df[["Time (IST)", "Price (Lacs)"]].set_index("Time (IST)")
+                    st.line_chart(chart_df)
+                else:
+                    st.info("Add more predictions to see the price trend over time 📈")
+
+                st.markdown("#### 🏙️ Average price by city (in your history)")
+                city_stats = df.groupby("City", dropna=True)["Price (Lacs)"].mean().reset_index()
+                if not city_stats.empty and len(city_stats) > 0:
+                    city_stats = city_stats.rename(columns={"Price (Lacs)": "Avg Price (Lacs)"})
+                    st.bar_chart(city_stats.set_index("City"))
+                else:
+                    st.info("Make predictions for different cities to compare average prices 🏙️")
 
     st.markdown(
         "<hr style='border-color:rgba(55,65,81,0.7); margin-top:1.8rem; margin-bottom:0.4rem;'/>",
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from drift_monitor import record_payload, record_rows
+from log_archive import ARCHIVE_DIR, recent_logs
+
+# ===================== CONFIG ===========================
+
+DB_PATH = "auth_logs.db"
+# ARCHIVE_DIR (from log_archive) is where get_user_logs() looks for archived rows;
+# point it elsewhere together with DB_PATH when using a scratch database
+PASSWORD_SALT = "some_static_salt_change_me"  # demo only
+SQLITE_TIMEOUT_S = 5.0  # how long a writer waits on a locked database (sqlite3's default)
+
+
+# ===================== DB HELPERS =======================
+
+def get_conn():
+    conn = sqlite3.connect(DB_PATH, timeout=SQLITE_TIMEOUT_S)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_db():
+    with get_conn() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS audit_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                price_lacs REAL NOT NULL,
+                city TEXT,
+                area TEXT,
+                payload TEXT
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS drift_sketch (
+                profile_id TEXT NOT NULL,
+                feature TEXT NOT NULL,
+                bin INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (profile_id, feature, bin)
+            )
+            """
+        )
+        conn.commit()
+
+
+def hash_password(password: str) -> str:
+    data = (PASSWORD_SALT + password).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def create_user(username: str, email: str, password: str):
+    try:
+        with get_conn() as conn:
+            conn.execute(
+                "INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+                (username, email, hash_password(password), datetime.utcnow().isoformat()),
+            )
+            conn.commit()
+        return True, "Account created successfully. You can login now."
+    except sqlite3.IntegrityError:
+        return False, "Username or email already exists."
+
+
+def authenticate_user(username: str, password: str) -> bool:
+    with get_conn() as conn:
+        cur = conn.execute(
+            "SELECT password_hash FROM users WHERE username = ?",
+            (username,),
+        )
+        row = cur.fetchone()
+    if not row:
+        return False
+    return row["password_hash"] == hash_password(password)
+
+
+def get_user_by_email(username: str, email: str):
+    with get_conn() as conn:
+        cur = conn.execute(
+            "SELECT * FROM users WHERE username = ? AND email = ?",
+            (username, email),
+        )
+        return cur.fetchone()
+
+
+def reset_user_password(username: str, new_password: str):
+    with get_conn() as conn:
+        conn.execute(
+            "UPDATE users SET password_hash = ? WHERE username = ?",
+            (hash_password(new_password), username),
+        )
+        conn.commit()
+
+
+def log_prediction(username: str, price_lacs: float, city: str, area: str, payload: dict):
+    with get_conn() as conn:
+        conn.execute(
+            "INSERT INTO audit_logs (username, ts, price_lacs, city, area, payload) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                username,
+                datetime.utcnow().isoformat(),
+                price_lacs,
+                city,
+                area,
+                json.dumps(payload),
+            ),
+        )
+        # live input histograms for the drift monitor (constant size, no log rescans)
+        record_payload(conn, payload)
+        conn.commit()
+
+
+def log_batch_prediction(username: str, summary: dict, rows: pd.DataFrame):
+    """One audit entry for a whole upload instead of one per priced row."""
+    with get_conn() as conn:
+        conn.execute(
+            "INSERT INTO audit_logs (username, ts, price_lacs, city, area, payload) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                username,
+                datetime.utcnow().isoformat(),
+                summary["mean_price_lacs"] or 0.0,
+                "Portfolio upload",
+                summary["file"],
+                json.dumps(summary),
+            ),
+        )
+        record_rows(conn, rows, source="batch")
+        conn.commit()
+
+
+def get_user_logs(username: str):
+    # recent rows live in SQLite; older ones may have been moved to the archive
+    with get_conn() as conn:
+        return recent_logs(conn, username, limit=50, archive_dir=ARCHIVE_DIR)
@@ -0,0 +1,148 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import BHK_OR_RK_CODES, FEATURE_COLS, MODEL_PATH, POSTED_BY_CODES
+from geo_validation import validate_coordinates
+
+# ===================== CONFIG ===========================
+
+CHUNK_ROWS = 5_000
+MAX_BATCH_ROWS = 500_000
+PRICE_COL = "PREDICTED_PRICE_LACS"
+STATUS_COL = "PRICING_STATUS"
+BINARY_COLS = ["UNDER_CONSTRUCTION", "RERA", "READY_TO_MOVE", "RESALE"]
+
+
+# ===================== VALIDATION =======================
+
+def validate_batch(df: pd.DataFrame):
+    """
+    Check and encode an uploaded file in the house_prices.csv schema.
+
+    All checks are column-wise. Rows that fail keep their data and get a
+    reason in STATUS_COL instead of a price. Swapped coordinates are fixed
+    the same way as in training.
+
+    Returns (X, status, report): X has one encoded row per input row (NaN
+    where invalid), status is "ok" or the first failing check.
+    """
+    missing = [c for c in FEATURE_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    if len(df) > MAX_BATCH_ROWS:
+        raise ValueError(f"file has {len(df):,} rows, the limit is {MAX_BATCH_ROWS:,}")
+
+    n = len(df)
+    status = np.full(n, "ok", dtype=object)
+
+    def fail(mask, reason):
+        mask = np.asarray(mask) & (status == "ok")
+        status[mask] = reason
+
+    X = pd.DataFrame(index=df.index)
+    X["POSTED_BY"] = df["POSTED_BY"].astype(str).str.strip().str.title().map(POSTED_BY_CODES)
+    fail(X["POSTED_BY"].isna(), "unknown POSTED_BY")
+    X["BHK_OR_RK"] = df["BHK_OR_RK"].astype(str).str.strip().str.upper().map(BHK_OR_RK_CODES)
+    fail(X["BHK_OR_RK"].isna(), "unknown BHK_OR_RK")
+
+    for col in ["BHK_NO.", "SQUARE_FT", "LONGITUDE", "LATITUDE", *BINARY_COLS]:
+        X[col] = pd.to_numeric(df[col], errors="coerce")
+        fail(X[col].isna(), f"non-numeric {col}")
+    for col in BINARY_COLS:
+        fail(~X[col].isin([0, 1]), f"{col} must be 0 or 1")
+    fail(X["BHK_NO."] < 1, "BHK_NO. must be at least 1")
+    fail(X["SQUARE_FT"] <= 0, "SQUARE_FT must be positive")
+
+    X, coord_report = validate_coordinates(X)
+    fail(~X.pop("COORD_VALID").to_numpy(), "coordinates outside India")
+
+    X = X[FEATURE_COLS].astype(np.float64)
+    ok = status == "ok"
+    X[~ok] = np.nan
+    report = {
+        "rows": n,
+        "valid": int(ok.sum()),
+        "invalid": int((~ok).sum()),
+        "swapped_coords": coord_report["swapped"],
+        "reasons": pd.Series(status[~ok]).value_counts().to_dict(),
+    }
+    return X, status, report
+
+
+# ===================== SCORING ==========================
+
+def score_in_chunks(model, X: pd.DataFrame, valid: np.ndarray, chunk_rows: int = CHUNK_ROWS):
+    """
+    Yield (rows_done, prices_so_far) after each chunk of valid rows.
+
+    The caller owns the loop, so it can update a progress bar or stop
+    early. Only one chunk of model input exists at a time.
+    """
+    prices = np.full(len(X), np.nan)
+    idx = np.flatnonzero(valid)
+    for start in range(0, len(idx), chunk_rows):
+        part = idx[start:start + chunk_rows]
+        prices[part] = model.predict(X.iloc[part])
+        yield start + len(part), prices
+    if len(idx) == 0:
+        yield 0, prices
+
+
+def price_file(model, df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    """Non-interactive version: validate, score everything, return the priced frame."""
+    X, status, report = validate_batch(df)
+    prices = None
+    for _, prices in score_in_chunks(model, X, status == "ok", chunk_rows):
+        pass
+    return attach_results(df, prices, status), X, report
+
+
+def attach_results(df: pd.DataFrame, prices: np.ndarray, status: np.ndarray) -> pd.DataFrame:
+    out = df.copy()
+    out[PRICE_COL] = np.round(prices, 2)
+    out[STATUS_COL] = status
+    return out
+
+
+def batch_summary(file_name: str, prices: np.ndarray, report: dict, elapsed_s: float) -> dict:
+    """Payload for the single audit log entry written per upload."""
+    priced = prices[~np.isnan(prices)]
+    return {
+        "batch": True,
+        "file": file_name,
+        "rows": report["rows"],
+        "priced": int(len(priced)),
+        "invalid": report["invalid"],
+        "swapped_coords": report["swapped_coords"],
+        "mean_price_lacs": float(priced.mean()) if len(priced) else None,
+        "median_price_lacs": float(np.median(priced)) if len(priced) else None,
+        "min_price_lacs": float(priced.min()) if len(priced) else None,
+        "max_price_lacs": float(priced.max()) if len(priced) else None,
+        "elapsed_s": round(elapsed_s, 3),
+    }
+
+
+if __name__ == "__main__":
+    import joblib
+
+    model = joblib.load(MODEL_PATH)
+    base = pd.read_csv("house_prices.csv")
+    big = base.sample(100_000, replace=True, random_state=0).reset_index(drop=True)
+
+    t0 = time.perf_counter()
+    X, status, report = validate_batch(big)
+    t_validate = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _, prices in score_in_chunks(model, X, status == "ok"):
+        pass
+    t_score = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    csv_bytes = attach_results(big, prices, status).to_csv(index=False).encode("utf-8")
+    t_out = time.perf_counter() - t0
+
+    print(f"📁 {report['rows']:,} rows: {report['valid']:,} valid, {report['invalid']:,} invalid "
+          f"({report['swapped_coords']:,} coordinate pairs swapped)")
+    print(f"   validate+encode {t_validate:.2f}s · score {t_score:.2f}s · "
+          f"build CSV {t_out:.2f}s ({len(csv_bytes) / 1e6:.1f} MB)")
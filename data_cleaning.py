@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+# ===================== CONFIG ===========================
+
+TARGET_COL = "TARGET(PRICE_IN_LACS)"
+IQR_K = 1.5            # classic Tukey fence
+MIN_CITY_ROWS = 20     # smaller cities fall back to the global fence
+
+
+# ===================== HELPERS ==========================
+
+def city_from_address(address: pd.Series) -> pd.Series:
+    """ADDRESS looks like "Locality,City" -> take the last part."""
+    return address.astype(str).str.rsplit(",", n=1).str[-1].str.strip()
+
+
+def group_quantiles(values: np.ndarray, codes: np.ndarray, qs) -> np.ndarray:
+    """
+    Per-group linear-interpolated quantiles without a Python loop.
+    Returns an array of shape (n_groups, len(qs)).
+    """
+    order = np.lexsort((values, codes))
+    sorted_vals = values[order]
+    counts = np.bincount(codes)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    out = np.empty((len(counts), len(qs)))
+    for k, q in enumerate(qs):
+        pos = starts + q * np.maximum(counts - 1, 0)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, starts + np.maximum(counts - 1, 0))
+        frac = pos - lo
+        lo = np.minimum(lo, len(sorted_vals) - 1)
+        hi = np.minimum(hi, len(sorted_vals) - 1)
+        out[:, k] = sorted_vals[lo] * (1 - frac) + sorted_vals[hi] * frac
+    out[counts == 0] = np.nan
+    return out
+
+
+def iqr_mask(values: np.ndarray, codes: np.ndarray, k: float = IQR_K,
+             min_rows: int = MIN_CITY_ROWS) -> np.ndarray:
+    """True for rows inside their group's [Q1 - k*IQR, Q3 + k*IQR] fence."""
+    per_group = group_quantiles(values, codes, (0.25, 0.75))
+    g_q1, g_q3 = np.quantile(values, (0.25, 0.75))
+
+    small = np.bincount(codes, minlength=len(per_group)) < min_rows
+    per_group[small] = (g_q1, g_q3)
+
+    q1 = per_group[codes, 0]
+    q3 = per_group[codes, 1]
+    iqr = q3 - q1
+    return (values >= q1 - k * iqr) & (values <= q3 + k * iqr)
+
+
+def duplicate_mask(df: pd.DataFrame, cols) -> np.ndarray:
+    """True for every row whose hashed contents were already seen."""
+    hashes = pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+    _, first_idx = np.unique(hashes, return_index=True)
+    dup = np.ones(len(df), dtype=bool)
+    dup[first_idx] = False
+    return dup
+
+
+def downcast(df: pd.DataFrame, exclude=()) -> pd.DataFrame:
+    """Shrink numeric columns to the smallest safe dtype, strings to category."""
+    out = df.copy()
+    for col in out.columns:
+        if col in exclude:
+            continue
+        s = out[col]
+        if pd.api.types.is_integer_dtype(s):
+            out[col] = pd.to_numeric(s, downcast="integer")
+        elif pd.api.types.is_float_dtype(s):
+            out[col] = s.astype(np.float32)
+        elif not pd.api.types.is_numeric_dtype(s):
+            out[col] = s.astype("category")
+    return out
+
+
+# ===================== CLEANING STAGE ===================
+
+def clean_dataset(df: pd.DataFrame, target_col: str = TARGET_COL, k: float = IQR_K):
+    """
+    Drop invalid rows, duplicate listings and per-city price/sqft outliers,
+    then downcast dtypes.
+
+    Returns (clean_df, report).
+    """
+    report = {"rows_in": int(len(df)), "mem_in_mb": df.memory_usage(deep=True).sum() / 1e6}
+
+    price = df[target_col].to_numpy(dtype=np.float64)
+    sqft = df["SQUARE_FT"].to_numpy(dtype=np.float64)
+    valid = np.isfinite(price) & np.isfinite(sqft) & (price > 0) & (sqft > 0)
+    report["invalid"] = int((~valid).sum())
+    df = df[valid]
+
+    dup = duplicate_mask(df, list(df.columns))
+    report["duplicates"] = int(dup.sum())
+    df = df[~dup]
+
+    city = city_from_address(df["ADDRESS"]) if "ADDRESS" in df.columns else pd.Series("all", index=df.index)
+    codes, _ = pd.factorize(city)
+    ppsf = np.log(df[target_col].to_numpy(dtype=np.float64) * 1_00_000 / df["SQUARE_FT"].to_numpy(dtype=np.float64))
+    keep = iqr_mask(ppsf, codes, k=k)
+    report["price_per_sqft_outliers"] = int((~keep).sum())
+    df = df[keep]
+
+    df = downcast(df, exclude=(target_col,))
+    report["rows_out"] = int(len(df))
+    report["mem_out_mb"] = df.memory_usage(deep=True).sum() / 1e6
+    return df, report
+
+
+def format_report(report: dict) -> str:
+    return (
+        f"rows {report['rows_in']} -> {report['rows_out']} "
+        f"(invalid={report['invalid']}, duplicates={report['duplicates']}, "
+        f"price/sqft outliers={report['price_per_sqft_outliers']}), "
+        f"memory {report['mem_in_mb']:.2f} MB -> {report['mem_out_mb']:.2f} MB"
+    )
+
+
+# ===================== BENCHMARK ========================
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.model_selection import train_test_split
+
+    from features import encode_features as encode
+    from geo_validation import validate_coordinates
+
+    raw = pd.read_csv("house_prices.csv")
+    raw, _ = validate_coordinates(raw, drop_invalid=True)
+    train_raw, test = train_test_split(raw, test_size=0.2, random_state=42)
+
+    t0 = time.perf_counter()
+    train_clean, report = clean_dataset(train_raw)
+    print(f"🧹 Cleaning took {time.perf_counter() - t0:.3f}s: {format_report(report)}")
+
+    # typical listings: test rows that would survive the same cleaning
+    test_typical, _ = clean_dataset(test)
+
+    for name, frame in [("raw", train_raw), ("cleaned", train_clean)]:
+        model = RandomForestRegressor(n_estimators=50, max_depth=12, random_state=42, n_jobs=-1)
+        t0 = time.perf_counter()
+        model.fit(encode(frame), frame[TARGET_COL])
+        fit_s = time.perf_counter() - t0
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.pkl")
+            joblib.dump(model, path, compress=3)
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+
+        X_one = encode(test.iloc[:1])
+        t0 = time.perf_counter()
+        for _ in range(50):
+            model.predict(X_one)
+        latency_ms = (time.perf_counter() - t0) / 50 * 1000
+
+        nodes = sum(e.tree_.node_count for e in model.estimators_)
+        print(f"\n📊 {name} training set ({len(frame)} rows)")
+        print(f"   fit time      : {fit_s:.2f}s")
+        print(f"   model size    : {size_mb:.2f} MB ({nodes} nodes)")
+        print(f"   1-row latency : {latency_ms:.2f} ms")
+        for label, ev in [("all test rows", test), ("typical test rows", test_typical)]:
+            pred = model.predict(encode(ev))
+            print(f"   {label:<18}: MAE {mean_absolute_error(ev[TARGET_COL], pred):.2f}  "
+                  f"R² {r2_score(ev[TARGET_COL], pred):.3f}")
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# ===================== CONFIG ===========================
+
+PROFILE_PATH = "house_price_profile.json"
+N_BINS = 10
+MAX_CATEGORIES = 12     # features with few distinct values are counted per value
+EPS = 1e-4              # floor for empty bins in PSI
+PSI_MODERATE, PSI_MAJOR = 0.1, 0.25
+SOURCES = ("live", "batch")  # interactive predictions vs portfolio uploads, sketched apart
+
+
+# ===================== REFERENCE PROFILE ================
+
+def build_profile(X: pd.DataFrame, n_bins: int = N_BINS) -> dict:
+    """
+    Training-time reference: for each feature a fixed set of bins and the
+    share of training rows in each. Live sketches reuse the same bins.
+    """
+    features = {}
+    for col in X.columns:
+        values = X[col].to_numpy(dtype=np.float64)
+        uniques = np.unique(values[~np.isnan(values)])
+        if len(uniques) <= MAX_CATEGORIES:
+            spec = {"kind": "categorical", "values": uniques.tolist()}
+        else:
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+            spec = {"kind": "numeric", "edges": edges.tolist()}
+        counts = np.bincount(bin_values(spec, values), minlength=n_bins_for(spec))
+        spec["ref"] = (counts / counts.sum()).tolist()
+        features[col] = spec
+
+    profile = {"rows": int(len(X)), "created_at": datetime.utcnow().isoformat(), "features": features}
+    profile["id"] = hashlib.sha256(json.dumps(features, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return profile
+
+
+def save_profile(profile: dict, path: str = PROFILE_PATH):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as fh:
+        json.dump(profile, fh)
+    os.replace(tmp_path, path)
+
+
+_profile_cache = {}
+
+
+def load_profile(path: str = PROFILE_PATH):
+    """Cached by mtime, so a retrain is picked up without a restart."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _profile_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as fh:
+            cached = (mtime, json.load(fh))
+        _profile_cache[path] = cached
+    return cached[1]
+
+
+# ===================== BINNING ==========================
+
+def n_bins_for(spec: dict) -> int:
+    if spec["kind"] == "numeric":
+        return len(spec["edges"]) + 1
+    return len(spec["values"]) + 1  # last bin collects unseen values
+
+
+def bin_values(spec: dict, values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    if spec["kind"] == "numeric":
+        return np.searchsorted(np.asarray(spec["edges"]), values, side="right")
+    known = np.asarray(spec["values"])
+    idx = np.searchsorted(known, values)
+    idx_clipped = np.minimum(idx, len(known) - 1)
+    hit = known[idx_clipped] == values
+    return np.where(hit, idx_clipped, len(known))
+
+
+# ===================== STREAMING SKETCHES ===============
+
+def _sketch_id(profile: dict, source: str) -> str:
+    # "live" keeps the bare profile id, so existing sketches stay valid
+    return profile["id"] if source == "live" else f"{profile['id']}/{source}"
+
+
+def record_rows(conn, rows: pd.DataFrame, profile: dict = None, source: str = "live"):
+    """
+    Add rows to the per-feature histograms in the drift_sketch table.
+    Runs inside the caller's connection/transaction. Cost depends on the
+    number of bins, not on how many predictions were logged before.
+
+    Each source has its own histograms, so one large upload cannot
+    swamp the interactive traffic.
+    """
+    profile = profile or load_profile()
+    if profile is None:
+        return
+    sketch_id = _sketch_id(profile, source)
+    updates = []
+    for col, spec in profile["features"].items():
+        if col not in rows.columns:
+            continue
+        counts = np.bincount(bin_values(spec, rows[col]), minlength=n_bins_for(spec))
+        updates.extend((sketch_id, col, int(b), int(c)) for b, c in enumerate(counts) if c)
+    conn.executemany(
+        "INSERT INTO drift_sketch (profile_id, feature, bin, count) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(profile_id, feature, bin) DO UPDATE SET count = count + excluded.count",
+        updates,
+    )
+
+
+def record_payload(conn, payload: dict, profile: dict = None):
+    record_rows(conn, pd.DataFrame([payload]), profile)
+
+
+def load_sketches(conn, profile: dict, source: str = "live") -> dict:
+    cur = conn.execute(
+        "SELECT feature, bin, count FROM drift_sketch WHERE profile_id = ?",
+        (_sketch_id(profile, source),),
+    )
+    sketches = {col: np.zeros(n_bins_for(spec)) for col, spec in profile["features"].items()}
+    for feature, b, count in cur.fetchall():
+        if feature in sketches and b < len(sketches[feature]):
+            sketches[feature][b] = count
+    return sketches
+
+
+# ===================== DRIFT SCORES =====================
+
+def psi(expected, actual) -> float:
+    e = np.maximum(np.asarray(expected, dtype=np.float64), EPS)
+    a = np.maximum(np.asarray(actual, dtype=np.float64), EPS)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks_binned(expected, actual) -> float:
+    """KS statistic evaluated at the bin edges (exact for the binned data)."""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+
+def drift_report(conn, profile: dict = None, source: str = "live") -> pd.DataFrame:
+    """One row per feature: live count, PSI, KS and a status label."""
+    profile = profile or load_profile()
+    if profile is None:
+        return pd.DataFrame()
+    sketches = load_sketches(conn, profile, source)
+    records = []
+    for col, spec in profile["features"].items():
+        counts = sketches[col]
+        n = counts.sum()
+        ref = np.asarray(spec["ref"])
+        if n == 0:
+            score, ks = float("nan"), float("nan")
+        else:
+            live = counts / n
+            score = psi(ref, live)
+            ks = ks_binned(ref, live) if spec["kind"] == "numeric" else float("nan")
+        if np.isnan(score):
+            status = "no data"
+        elif score >= PSI_MAJOR:
+            status = "🔴 drift"
+        elif score >= PSI_MODERATE:
+            status = "🟠 moderate"
+        else:
+            status = "🟢 stable"
+        records.append({"Feature": col, "Live rows": int(n), "PSI": score, "KS": ks, "Status": status})
+    return pd.DataFrame(records)
@@ -0,0 +1,121 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from flat_forest import FlatForest
+
+# ===================== CONFIG ===========================
+
+FEATURE_LABELS = {
+    "POSTED_BY": "Posted by",
+    "UNDER_CONSTRUCTION": "Under construction",
+    "RERA": "RERA",
+    "BHK_NO.": "BHK count",
+    "BHK_OR_RK": "BHK / RK",
+    "SQUARE_FT": "Area (sq ft)",
+    "READY_TO_MOVE": "Ready to move",
+    "RESALE": "Resale",
+    "LONGITUDE": "Longitude",
+    "LATITUDE": "Latitude",
+}
+
+
+# ===================== PATH EXPLAINER ===================
+
+class PathExplainer:
+    """
+    Saabas-style attribution straight from the forest's node arrays.
+
+    Walking a row down a tree, every split moves the running estimate from
+    the node's mean to the child's mean. That change is credited to the
+    split feature. Averaged over trees:
+
+        prediction = bias + sum(contributions)
+
+    where bias is the mean root value. All trees and rows advance together,
+    one depth level per NumPy step.
+    """
+
+    def __init__(self, model):
+        self.model = model  # keeps the source model alive while cached
+        if hasattr(model, "to_flat"):        # CompactForest
+            self.forest = model.to_flat()
+        elif isinstance(model, FlatForest):
+            self.forest = model
+        else:                                # fitted RandomForestRegressor
+            self.forest = FlatForest.from_model(model)
+        self.value = self.forest.value.astype(np.float64)
+        self.n_features = int(self.forest.feature.max()) + 1
+        self.feature_names = self.forest.feature_names or [f"f{i}" for i in range(self.n_features)]
+        self.n_features = max(self.n_features, len(self.feature_names))
+        self.bias = float(self.value[self.forest.roots].mean())
+
+    def explain(self, X):
+        """Returns (bias, contributions) with contributions shaped (n_rows, n_features)."""
+        f = self.forest
+        X = f._to_matrix(X)
+        n, n_trees = len(X), f.n_trees
+        node = np.repeat(f.roots[None, :].astype(np.int64), n, axis=0)
+        rows = np.arange(n)[:, None]
+        flat_rows = np.repeat(np.arange(n), n_trees) * self.n_features
+        contrib = np.zeros(n * self.n_features)
+
+        for _ in range(f.max_depth):
+            left = f.left[node]
+            leaf = left < 0
+            if leaf.all():
+                break
+            feat = f.feature[node]
+            go_left = X[rows, feat] <= f.threshold[node]
+            nxt = np.where(leaf, node, np.where(go_left, left, f.right[node]))
+            delta = np.where(leaf, 0.0, self.value[nxt] - self.value[node])
+            contrib += np.bincount((flat_rows + np.where(leaf, 0, feat).ravel()),
+                                   weights=delta.ravel(), minlength=contrib.size)
+            node = nxt
+
+        return self.bias, contrib.reshape(n, self.n_features) / n_trees
+
+    def explain_frame(self, X) -> pd.DataFrame:
+        """Contributions as a DataFrame with one column per feature."""
+        _, contrib = self.explain(X)
+        return pd.DataFrame(contrib, columns=self.feature_names)
+
+
+def contributions_for_chart(explainer: PathExplainer, X_row) -> pd.DataFrame:
+    """One row's contributions, labelled and sorted by impact, in Lacs."""
+    _, contrib = explainer.explain(X_row)
+    names = [FEATURE_LABELS.get(c, c) for c in explainer.feature_names]
+    df = pd.DataFrame({"Feature": names, "Contribution (Lacs)": contrib[0]})
+    order = df["Contribution (Lacs)"].abs().sort_values(ascending=False).index
+    return df.loc[order].set_index("Feature")
+
+
+if __name__ == "__main__":
+    import joblib
+
+    from features import MODEL_PATH, load_training_data
+
+    model = joblib.load(MODEL_PATH)
+    X, _ = load_training_data()
+    explainer = PathExplainer(model)
+
+    sample = X.iloc[:1000]
+    bias, contrib = explainer.explain(sample)
+    err = np.abs(bias + contrib.sum(axis=1) - model.predict(sample)).max()
+    print(f"✅ bias + contributions reproduce predictions (max error {err:.2e})")
+
+    one = X.iloc[:1]
+    explainer.explain(one)
+    timings = []
+    for _ in range(50):
+        t0 = time.perf_counter()
+        explainer.explain(one)
+        timings.append(time.perf_counter() - t0)
+    print(f"⚡ single row: {np.median(timings) * 1000:.2f} ms median")
+
+    t0 = time.perf_counter()
+    explainer.explain(sample)
+    took = time.perf_counter() - t0
+    print(f"⚡ batch of {len(sample)}: {took * 1000:.1f} ms ({took / len(sample) * 1000:.3f} ms/row)")
+    print(contributions_for_chart(explainer, one))
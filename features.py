@@ -0,0 +1,48 @@
+import pandas as pd
+
+from data_cleaning import clean_dataset
+from geo_validation import validate_coordinates
+
+# ===================== SCHEMA ===========================
+
+DATA_PATH = "house_prices.csv"
+MODEL_PATH = "house_price_model.pkl"
+TARGET_COL = "TARGET(PRICE_IN_LACS)"
+
+FEATURE_COLS = [
+    "POSTED_BY",
+    "UNDER_CONSTRUCTION",
+    "RERA",
+    "BHK_NO.",
+    "BHK_OR_RK",
+    "SQUARE_FT",
+    "READY_TO_MOVE",
+    "RESALE",
+    "LONGITUDE",
+    "LATITUDE",
+]
+
+# Fixed category codes shared by training (train_model.py, sharded_training.py)
+# and serving (app, batch pricing). Alphabetical, like the original cat.codes.
+POSTED_BY_CODES = {"Builder": 0, "Dealer": 1, "Owner": 2}
+BHK_OR_RK_CODES = {"BHK": 0, "RK": 1}
+
+
+# ===================== HELPERS ==========================
+
+def encode_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Raw CSV-schema rows -> the numeric matrix the model was trained on."""
+    X = df[FEATURE_COLS].copy()
+    if not pd.api.types.is_numeric_dtype(X["POSTED_BY"]):
+        X["POSTED_BY"] = X["POSTED_BY"].astype(str).map(POSTED_BY_CODES)
+    if not pd.api.types.is_numeric_dtype(X["BHK_OR_RK"]):
+        X["BHK_OR_RK"] = X["BHK_OR_RK"].astype(str).map(BHK_OR_RK_CODES)
+    return X
+
+
+def load_training_data(path: str = DATA_PATH):
+    """Load, validate, clean and encode the dataset the way train_model.py does."""
+    data = pd.read_csv(path)
+    data, _ = validate_coordinates(data, drop_invalid=True)
+    data, _ = clean_dataset(data)
+    return encode_features(data), data[TARGET_COL]
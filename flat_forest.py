@@ -0,0 +1,92 @@
+import numpy as np
+
+# ===================== FLAT FOREST ======================
+
+# All trees of a fitted RandomForestRegressor concatenated into plain
+# NumPy arrays. Child indices are global (already offset per tree), leaves
+# keep -1 as their child, so the arrays can live in shared memory, an mmap
+# or a compact file and be traversed without sklearn.
+ARRAY_NAMES = ("left", "right", "feature", "threshold", "value", "roots")
+
+
+def flatten_forest(model) -> dict:
+    """Extract the node arrays of every tree in a fitted forest."""
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for est in model.estimators_:
+        t = est.tree_
+        l = t.children_left.astype(np.int32)
+        r = t.children_right.astype(np.int32)
+        leaf = l == -1
+        left.append(np.where(leaf, -1, l + offset))
+        right.append(np.where(leaf, -1, r + offset))
+        feature.append(t.feature.astype(np.int32))
+        threshold.append(t.threshold.astype(np.float64))
+        value.append(t.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+        offset += t.node_count
+        max_depth = max(max_depth, t.max_depth)
+
+    return {
+        "left": np.concatenate(left),
+        "right": np.concatenate(right),
+        "feature": np.concatenate(feature),
+        "threshold": np.concatenate(threshold),
+        "value": np.concatenate(value),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "max_depth": max_depth,
+        "feature_names": list(getattr(model, "feature_names_in_", [])),
+    }
+
+
+class FlatForest:
+    """
+    Vectorized forest predictor over flat node arrays.
+    Gives the same results as RandomForestRegressor.predict.
+    """
+
+    def __init__(self, arrays: dict):
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.feature_names = list(arrays.get("feature_names", []))
+
+    @classmethod
+    def from_model(cls, model) -> "FlatForest":
+        return cls(flatten_forest(model))
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAY_NAMES)
+
+    def _to_matrix(self, X) -> np.ndarray:
+        if hasattr(X, "columns") and self.feature_names:
+            X = X[self.feature_names]
+        # sklearn compares float32 features against float64 thresholds
+        return np.asarray(X, dtype=np.float32)
+
+    def apply(self, X) -> np.ndarray:
+        """Global leaf index per (row, tree), shape (n_rows, n_trees)."""
+        X = self._to_matrix(X)
+        node = np.repeat(self.roots[None, :], len(X), axis=0)
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            left = self.left[node]
+            leaf = left == -1
+            if leaf.all():
+                break
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(leaf, node, np.where(go_left, left, self.right[node]))
+        return node
+
+    def predict(self, X) -> np.ndarray:
+        return self.value[self.apply(X)].mean(axis=1)
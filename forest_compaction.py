@@ -0,0 +1,300 @@
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from flat_forest import FlatForest
+
+# ===================== CONFIG ===========================
+
+# Candidate settings for export_compact(), most accurate first.
+# (leaf tolerance in Lacs, leaf value dtype)
+CANDIDATES = [
+    (0.0, np.float32),
+    (0.5, np.float32),
+    (1.0, np.float32),
+    (1.0, np.float16),
+    (2.5, np.float16),
+    (5.0, np.float16),
+]
+
+
+# ===================== COMPACT FOREST ===================
+
+class CompactForest(FlatForest):
+    """
+    FlatForest with small dtypes.
+
+    Child indices are local to each tree, so they fit in int16 whenever a
+    tree has fewer than 32k nodes. Features are int8. Thresholds are float32,
+    rounded down so that `x <= t` gives the same answer as sklearn's float64
+    threshold for every float32 x. Leaf values are float32 or float16.
+    Pickles with joblib and exposes predict(DataFrame), so load_model() and
+    ModelManager can serve it like the sklearn forest.
+    """
+
+    def apply(self, X) -> np.ndarray:
+        X = self._to_matrix(X)
+        roots = self.roots.astype(np.int64)[None, :]
+        local = np.zeros((len(X), len(self.roots)), dtype=np.int64)
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            node = roots + local
+            left = self.left[node]
+            leaf = left < 0
+            if leaf.all():
+                break
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            local = np.where(leaf, local, np.where(go_left, left, self.right[node]))
+        return roots + local
+
+    def predict(self, X) -> np.ndarray:
+        return self.value[self.apply(X)].astype(np.float64).mean(axis=1)
+
+    def to_flat(self) -> FlatForest:
+        """Same trees with global child indices, as FlatForest expects."""
+        sizes = np.diff(np.append(self.roots, len(self.left)))
+        offsets = np.repeat(self.roots, sizes)
+        left = self.left.astype(np.int32)
+        right = self.right.astype(np.int32)
+        leaf = left < 0
+        return FlatForest({
+            "left": np.where(leaf, -1, left + offsets),
+            "right": np.where(leaf, -1, right + offsets),
+            "feature": self.feature.astype(np.int32),
+            "threshold": self.threshold,
+            "value": self.value.astype(np.float64),
+            "roots": self.roots,
+            "max_depth": self.max_depth,
+            "feature_names": self.feature_names,
+        })
+
+
+def float32_floor(values: np.ndarray) -> np.ndarray:
+    """Largest float32 <= each float64 value."""
+    out = values.astype(np.float32)
+    too_big = out.astype(np.float64) > values
+    out[too_big] = np.nextafter(out[too_big], np.float32(-np.inf))
+    return out
+
+
+# ===================== PER-TREE PASSES ==================
+
+def _collapse_mask(tree, tol: float) -> np.ndarray:
+    """
+    Bottom-up: mark internal nodes whose whole subtree predicts within tol
+    of the node's own mean. Turning them into leaves moves any single
+    tree's prediction (and so the forest mean) by at most tol.
+    """
+    left, right = tree.children_left, tree.children_right
+    value = tree.value[:, 0, 0]
+    is_leaf = left == -1
+    dev = np.zeros(tree.node_count)
+    # sklearn stores nodes in pre-order, so children always come after parents
+    for i in range(tree.node_count - 1, -1, -1):
+        if not is_leaf[i]:
+            l, r = left[i], right[i]
+            d = max(abs(value[l] - value[i]) + dev[l], abs(value[r] - value[i]) + dev[r])
+            if d <= tol and is_leaf[l] and is_leaf[r]:
+                is_leaf[i] = True
+            dev[i] = d
+    return is_leaf
+
+
+def _compact_tree(tree, tol: float, n_features: int):
+    """
+    Rebuild one tree in pre-order, dropping:
+    - subtrees collapsed by _collapse_mask
+    - splits whose outcome is already fixed by an ancestor on the same feature
+    - splits whose two leaves end up with the same value
+    Returns local (left, right, feature, threshold, value, depth).
+    """
+    is_leaf = _collapse_mask(tree, tol)
+    thr32 = float32_floor(tree.threshold)
+    value = tree.value[:, 0, 0]
+
+    left, right, feature, threshold, out_value = [], [], [], [], []
+
+    def emit(f, t, v):
+        left.append(-1)
+        right.append(-1)
+        feature.append(f)
+        threshold.append(t)
+        out_value.append(v)
+        return len(left) - 1
+
+    def build(i, lo, hi, depth):
+        while not is_leaf[i]:
+            f, t = tree.feature[i], thr32[i]
+            if hi[f] <= t:          # every x reaching here is <= t
+                i = tree.children_left[i]
+            elif t <= lo[f]:        # every x reaching here is > t
+                i = tree.children_right[i]
+            else:
+                break
+        if is_leaf[i]:
+            return emit(-2, -2.0, value[i]), depth
+
+        f, t = tree.feature[i], thr32[i]
+        idx = emit(f, t, value[i])
+        hi_l = hi.copy()
+        hi_l[f] = t
+        lo_r = lo.copy()
+        lo_r[f] = t
+        l_idx, l_depth = build(tree.children_left[i], lo, hi_l, depth + 1)
+        r_idx, r_depth = build(tree.children_right[i], lo_r, hi, depth + 1)
+
+        if (left[l_idx] == -1 and left[r_idx] == -1 and r_idx == l_idx + 1
+                and out_value[l_idx] == out_value[r_idx]):
+            merged = out_value[l_idx]
+            del left[l_idx:], right[l_idx:], feature[l_idx:], threshold[l_idx:], out_value[l_idx:]
+            feature[idx], threshold[idx], out_value[idx] = -2, -2.0, merged
+            return idx, depth
+
+        left[idx], right[idx] = l_idx, r_idx
+        return idx, max(l_depth, r_depth)
+
+    lo = np.full(n_features, -np.inf, dtype=np.float32)
+    hi = np.full(n_features, np.inf, dtype=np.float32)
+    _, depth = build(0, lo, hi, 0)
+    return left, right, feature, threshold, out_value, depth
+
+
+# ===================== FOREST COMPACTION ================
+
+def compact_forest(model, tol: float = 0.0, value_dtype=np.float32) -> CompactForest:
+    """Post-process a fitted RandomForestRegressor into a CompactForest."""
+    n_features = model.n_features_in_
+    parts = [_compact_tree(est.tree_, tol, n_features) for est in model.estimators_]
+
+    sizes = [len(p[0]) for p in parts]
+    index_dtype = np.int16 if max(sizes) <= np.iinfo(np.int16).max else np.int32
+    feature_dtype = np.int8 if n_features <= np.iinfo(np.int8).max else np.int16
+
+    arrays = {
+        "left": np.concatenate([np.asarray(p[0], dtype=index_dtype) for p in parts]),
+        "right": np.concatenate([np.asarray(p[1], dtype=index_dtype) for p in parts]),
+        "feature": np.concatenate([np.asarray(p[2], dtype=feature_dtype) for p in parts]),
+        "threshold": np.concatenate([np.asarray(p[3], dtype=np.float32) for p in parts]),
+        "value": np.concatenate([np.asarray(p[4], dtype=value_dtype) for p in parts]),
+        "roots": np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int32),
+        "max_depth": max(p[5] for p in parts),
+        "feature_names": list(getattr(model, "feature_names_in_", [])),
+    }
+    return CompactForest(arrays)
+
+
+# ===================== MEASUREMENT ======================
+
+def sklearn_forest_nbytes(model) -> int:
+    """In-memory size of the node and value arrays of a sklearn forest."""
+    total = 0
+    for est in model.estimators_:
+        state = est.tree_.__getstate__()
+        total += state["nodes"].nbytes + state["values"].nbytes
+    return total
+
+
+def artifact_bytes(obj, compress: int = 3) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pkl")
+        joblib.dump(obj, path, compress=compress)
+        return os.path.getsize(path)
+
+
+def single_row_latency_ms(model, X, repeats: int = 50) -> float:
+    row = X.iloc[:1]
+    model.predict(row)
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - t0)
+    return float(np.median(timings) * 1000)
+
+
+def compare(model, compact, X_val, y_val) -> dict:
+    """Accuracy delta, artifact size and in-memory size, original vs compact."""
+    ref = model.predict(X_val)
+    new = compact.predict(X_val)
+    y = np.asarray(y_val, dtype=np.float64)
+    return {
+        "nodes": (sum(e.tree_.node_count for e in model.estimators_), len(compact.left)),
+        "mae": (float(np.abs(ref - y).mean()), float(np.abs(new - y).mean())),
+        "max_abs_delta": float(np.abs(ref - new).max()),
+        "artifact_bytes": (artifact_bytes(model), artifact_bytes(compact)),
+        "memory_bytes": (sklearn_forest_nbytes(model), compact.nbytes),
+        "latency_ms": (single_row_latency_ms(model, X_val), single_row_latency_ms(compact, X_val)),
+    }
+
+
+def format_comparison(stats: dict) -> str:
+    mb = 1024 * 1024
+    lines = [
+        f"   nodes          : {stats['nodes'][0]:>10,} -> {stats['nodes'][1]:,}",
+        f"   MAE (Lacs)     : {stats['mae'][0]:>10.3f} -> {stats['mae'][1]:.3f}"
+        f"  (max |Δ pred| {stats['max_abs_delta']:.3f})",
+        f"   artifact (MB)  : {stats['artifact_bytes'][0] / mb:>10.2f} -> {stats['artifact_bytes'][1] / mb:.2f}",
+        f"   in-memory (MB) : {stats['memory_bytes'][0] / mb:>10.2f} -> {stats['memory_bytes'][1] / mb:.2f}",
+        f"   1-row latency  : {stats['latency_ms'][0]:>10.2f} -> {stats['latency_ms'][1]:.2f} ms",
+    ]
+    return "\n".join(lines)
+
+
+# ===================== BUDGETED EXPORT ==================
+
+def export_compact(model, path: str, X_val, max_bytes: int = None, max_latency_ms: float = None,
+                   candidates=CANDIDATES, compress: int = 3):
+    """
+    Save the most accurate compaction that fits the size / latency budget.
+
+    Candidates are tried in order (most accurate first). The artifact is a
+    joblib pickle, loadable by load_model(). Raises ValueError if none fits.
+    """
+    tried = []
+    for tol, value_dtype in candidates:
+        compact = compact_forest(model, tol=tol, value_dtype=value_dtype)
+        size = artifact_bytes(compact, compress=compress)
+        latency = single_row_latency_ms(compact, X_val)
+        tried.append((tol, np.dtype(value_dtype).name, size, latency))
+        if (max_bytes is None or size <= max_bytes) and (max_latency_ms is None or latency <= max_latency_ms):
+            from model_manager import save_model_atomic
+
+            save_model_atomic(compact, path, compress=compress)
+            return compact, {"tol": tol, "value_dtype": np.dtype(value_dtype).name,
+                             "artifact_bytes": size, "latency_ms": latency}
+    details = ", ".join(f"tol={t} {d}: {s / 1e6:.2f} MB {l:.2f} ms" for t, d, s, l in tried)
+    raise ValueError(f"no compaction fits the budget ({details})")
+
+
+if __name__ == "__main__":
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import train_test_split
+
+    from features import load_training_data
+
+    X, y = load_training_data()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    shipped = RandomForestRegressor(n_estimators=50, max_depth=12, random_state=42, n_jobs=-1)
+    shipped.fit(X_train, y_train)
+    budget = artifact_bytes(shipped)
+    print(f"📦 Current artifact (50 trees, depth 12): {budget / 1024 / 1024:.2f} MB")
+
+    for tol, value_dtype in [(0.0, np.float32), (1.0, np.float32), (1.0, np.float16)]:
+        t0 = time.perf_counter()
+        compact = compact_forest(shipped, tol=tol, value_dtype=value_dtype)
+        took = time.perf_counter() - t0
+        print(f"\n🗜️ 50x12 forest, tol={tol} {np.dtype(value_dtype).name} (compaction {took:.1f}s)")
+        print(format_comparison(compare(shipped, compact, X_test, y_test)))
+
+    bigger = RandomForestRegressor(n_estimators=100, max_depth=13, random_state=42, n_jobs=-1)
+    bigger.fit(X_train, y_train)
+    path = os.path.join(tempfile.mkdtemp(), "compact_model.pkl")
+    compact, choice = export_compact(bigger, path, X_test, max_bytes=budget)
+    print(f"\n🌲 100 trees, depth 13 exported within {budget / 1024 / 1024:.2f} MB using "
+          f"tol={choice['tol']} {choice['value_dtype']}")
+    print(format_comparison(compare(bigger, compact, X_test, y_test)))
+    print(f"   shipped forest MAE for reference: {np.abs(shipped.predict(X_test) - y_test).mean():.3f}")
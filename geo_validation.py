@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+# ===================== GRID CONFIG ======================
+
+# The grid covers India's bounding box. Each cell is True when it lies on
+# (or next to) Indian land, so a lookup is just two index computations.
+LON_MIN, LON_MAX = 68.0, 98.0
+LAT_MIN, LAT_MAX = 6.0, 38.0
+GRID_RES = 0.1  # degrees per cell (~11 km); 320 x 300 cells, built in ~30 ms
+
+# Outline of mainland India as (longitude, latitude) vertices, traced to
+# roughly 5-10 km along the land borders and coarser along the coast. The
+# grid is dilated by one cell afterwards so coastal and border cities are
+# not flagged.
+#
+# Accuracy: a point more than ~0.15 deg (about 16 km) outside the outline
+# is always rejected; a point closer than that to the outline may be
+# accepted. That separates cities like Lahore, Sialkot, Kasur, Dhaka,
+# Sylhet, Rangpur, Thimphu and Kathmandu, but not twin towns across the
+# border or places within ~10 km of it: Birgunj (Raxaul), Biratnagar
+# (Jogbani), Nepalgunj (Rupaidiha), Phuntsholing (Jaigaon), Tamu (Moreh),
+# Rajshahi, Comilla, Feni and Brahmanbaria still pass. Good enough to
+# catch swapped or garbage coordinates, not to resolve a border.
+INDIA_OUTLINE = [
+    # west and south coast
+    (68.2, 23.7), (69.0, 22.4), (70.0, 21.0), (70.35, 20.8), (71.0, 20.6),
+    (71.5, 20.85), (72.6, 21.0), (72.8, 19.0),
+    (73.3, 17.0), (73.7, 15.5), (74.6, 13.0), (75.8, 11.2), (76.3, 9.5),
+    (76.55, 8.85), (76.95, 8.35), (77.5, 8.0), (78.2, 8.85), (78.6, 9.1),
+    # Pamban island (Rameswaram), Palk Bay, Point Calimere
+    (79.2, 9.2), (79.45, 9.15), (79.45, 9.3), (79.1, 9.45), (78.95, 9.85),
+    (79.35, 10.3), (79.9, 10.3), (79.85, 11.0), (79.85, 12.0), (80.3, 13.1),
+    (80.1, 15.5), (81.3, 16.3), (82.3, 17.0), (83.35, 17.65), (84.1, 18.25),
+    (84.8, 19.3), (86.5, 20.2),
+    (87.0, 21.5), (88.0, 21.6),
+    # around Bangladesh: West Bengal, the Siliguri corridor, Meghalaya,
+    # Barak valley, Tripura and Mizoram
+    (89.05, 21.65), (89.0, 22.3), (88.85, 23.0), (88.6, 23.6), (88.75, 24.15),
+    (88.4, 24.3), (88.15, 24.45), (88.05, 24.6), (88.1, 24.8), (88.3, 25.05),
+    (88.45, 25.15), (88.95, 25.25), (88.8, 25.45), (88.55, 25.5), (88.45, 25.65),
+    (88.3, 25.85), (88.2, 26.05), (88.35, 26.35), (88.4, 26.6), (88.55, 26.35),
+    (88.75, 26.28), (88.95, 26.25), (89.1, 26.15), (89.35, 26.08), (89.55, 26.1),
+    (89.6, 26.25), (89.75, 26.2), (89.85, 25.95), (89.85, 25.3), (90.5, 25.2),
+    (91.5, 25.2), (92.05, 25.2), (92.3, 25.15), (92.35, 24.9), (92.25, 24.5),
+    (92.0, 24.3), (91.83, 24.15), (91.6, 24.05), (91.35, 24.1), (91.23, 23.9),
+    (91.24, 23.5), (91.4, 23.2), (91.55, 23.15), (91.7, 22.95), (91.85, 22.95),
+    (92.0, 23.5), (92.25, 23.7), (92.3, 23.0), (92.35, 22.5), (92.6, 21.95),
+    # Myanmar and the McMahon line
+    (93.2, 22.0), (94.2, 23.5), (95.2, 26.0), (97.4, 27.9), (96.0, 29.4),
+    (94.6, 29.3), (92.0, 27.8),
+    # around Bhutan, then Sikkim
+    (91.6, 27.9), (91.6, 27.2), (92.1, 26.85), (89.8, 26.7), (88.9, 26.9),
+    (88.9, 27.3), (88.8, 28.1), (88.1, 27.9),
+    # Nepal's southern and western border
+    (88.0, 27.4), (88.1, 26.4), (87.0, 26.4), (86.0, 26.6), (85.0, 26.85),
+    (84.1, 27.4), (83.3, 27.35), (82.0, 27.8), (81.0, 28.4), (80.1, 28.8),
+    (81.0, 30.2),
+    # north
+    (79.0, 31.3), (79.5, 32.8), (80.0, 35.0), (77.8, 35.5), (74.5, 37.0),
+    (73.7, 34.5), (74.0, 33.0),
+    # Pakistan: Jammu, Punjab (east of Lahore), Rajasthan, Rann of Kutch
+    (74.7, 32.55), (75.05, 32.45), (75.35, 32.45), (75.38, 32.2), (75.05, 32.02),
+    (74.8, 31.9), (74.62, 31.7), (74.58, 31.5), (74.6, 31.25), (74.55, 31.1),
+    (74.58, 31.0), (74.2, 30.7), (73.9, 30.35), (73.65, 30.05), (73.45, 29.95),
+    (72.2, 28.4), (70.7, 27.9), (70.0, 27.2),
+    (69.5, 26.6), (70.1, 25.7), (69.6, 24.3), (68.8, 24.2),
+]
+
+# Island groups, OR'd into the same grid as the mainland.
+INDIA_ISLANDS = [
+    # Andaman & Nicobar
+    [
+        (92.2, 13.7), (93.1, 13.7), (93.0, 11.5), (92.8, 10.5), (93.2, 9.1),
+        (94.0, 7.9), (94.0, 6.7), (93.6, 6.7), (92.6, 8.0), (92.4, 9.3),
+        (92.4, 10.7), (92.2, 11.5),
+    ],
+    # Lakshadweep
+    [
+        (72.8, 8.0), (73.3, 8.0), (73.9, 10.0), (73.9, 11.0), (73.2, 12.0),
+        (71.8, 12.4), (71.9, 11.0), (72.4, 10.0), (72.8, 8.5),
+    ],
+]
+INDIA_POLYGONS = [INDIA_OUTLINE, *INDIA_ISLANDS]
+
+# Row status codes returned by check_coordinates()
+STATUS_OK = 0
+STATUS_SWAPPED = 1
+STATUS_OUT_OF_BOUNDS = 2
+
+
+# ===================== GRID BUILDING ====================
+
+def _points_in_polygon(lon: np.ndarray, lat: np.ndarray, polygon) -> np.ndarray:
+    """Vectorized even-odd ray casting test."""
+    inside = np.zeros(lon.shape, dtype=bool)
+    n = len(polygon)
+    for i in range(n):
+        x1, y1 = polygon[i]
+        x2, y2 = polygon[(i + 1) % n]
+        crosses = (y1 > lat) != (y2 > lat)
+        x_at = (x2 - x1) * (lat - y1) / ((y2 - y1) or 1e-12) + x1
+        inside ^= crosses & (lon < x_at)
+    return inside
+
+
+def build_india_grid(res: float = GRID_RES) -> np.ndarray:
+    """
+    Rasterize INDIA_POLYGONS into a boolean (lat, lon) grid.
+    The mask is dilated by one cell in every direction.
+    """
+    n_lat = int(round((LAT_MAX - LAT_MIN) / res))
+    n_lon = int(round((LON_MAX - LON_MIN) / res))
+    lat_c = LAT_MIN + (np.arange(n_lat) + 0.5) * res
+    lon_c = LON_MIN + (np.arange(n_lon) + 0.5) * res
+    lon_g, lat_g = np.meshgrid(lon_c, lat_c)
+    mask = np.zeros(lon_g.shape, dtype=bool)
+    for polygon in INDIA_POLYGONS:
+        mask |= _points_in_polygon(lon_g, lat_g, polygon)
+
+    padded = np.pad(mask, 1)
+    dilated = np.zeros_like(mask)
+    for di in (0, 1, 2):
+        for dj in (0, 1, 2):
+            dilated |= padded[di:di + n_lat, dj:dj + n_lon]
+    return dilated
+
+
+INDIA_GRID = build_india_grid()
+
+
+# ===================== LOOKUPS ==========================
+
+def in_india(lon, lat) -> np.ndarray:
+    """O(1) per point grid lookup. NaN or out-of-box points return False."""
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    i = np.floor((lat - LAT_MIN) / GRID_RES)
+    j = np.floor((lon - LON_MIN) / GRID_RES)
+    n_lat, n_lon = INDIA_GRID.shape
+    valid = (i >= 0) & (i < n_lat) & (j >= 0) & (j < n_lon)  # False for NaN
+    result = np.zeros(lon.shape, dtype=bool)
+    result[valid] = INDIA_GRID[i[valid].astype(np.intp), j[valid].astype(np.intp)]
+    return result
+
+
+def check_coordinates(lon, lat) -> np.ndarray:
+    """
+    Classify each (lon, lat) pair:
+    STATUS_OK, STATUS_SWAPPED (valid once swapped) or STATUS_OUT_OF_BOUNDS.
+    """
+    ok = in_india(lon, lat)
+    swapped = ~ok & in_india(lat, lon)
+    status = np.full(ok.shape, STATUS_OUT_OF_BOUNDS, dtype=np.int8)
+    status[ok] = STATUS_OK
+    status[swapped] = STATUS_SWAPPED
+    return status
+
+
+# ===================== DATAFRAME STAGE ==================
+
+def validate_coordinates(
+    df: pd.DataFrame,
+    lon_col: str = "LONGITUDE",
+    lat_col: str = "LATITUDE",
+    drop_invalid: bool = False,
+):
+    """
+    Fix swapped coordinates and flag (or drop) points outside India.
+
+    Returns (clean_df, report) where report holds row counts per status.
+    Out-of-bounds rows are kept unless drop_invalid=True; the returned
+    frame then has a boolean COORD_VALID column for callers to act on.
+    """
+    lon = df[lon_col].to_numpy(dtype=np.float64)
+    lat = df[lat_col].to_numpy(dtype=np.float64)
+    status = check_coordinates(lon, lat)
+
+    swap = status == STATUS_SWAPPED
+    out = df.copy()
+    out[lon_col] = np.where(swap, lat, lon)
+    out[lat_col] = np.where(swap, lon, lat)
+
+    invalid = status == STATUS_OUT_OF_BOUNDS
+    report = {
+        "rows": int(len(df)),
+        "ok": int((status == STATUS_OK).sum()),
+        "swapped": int(swap.sum()),
+        "out_of_bounds": int(invalid.sum()),
+    }
+
+    if drop_invalid:
+        out = out[~invalid]
+    else:
+        out["COORD_VALID"] = ~invalid
+    return out, report
+
+
+def format_report(report: dict) -> str:
+    return (
+        f"rows={report['rows']} ok={report['ok']} "
+        f"swapped={report['swapped']} out_of_bounds={report['out_of_bounds']}"
+    )
@@ -0,0 +1,330 @@
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from features import BHK_OR_RK_CODES, FEATURE_COLS, MODEL_PATH, POSTED_BY_CODES
+
+# ===================== CONFIG ===========================
+
+GOLDEN_PATH = "house_price_golden.json"
+N_SAMPLES = 400
+N_THRESHOLD_CASES = 60
+SEED = 20240601
+CATEGORY_CODES = {"POSTED_BY": POSTED_BY_CODES, "BHK_OR_RK": BHK_OR_RK_CODES}
+
+
+# ===================== GOLDEN SET =======================
+
+def encode_raw(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Raw form values -> model codes. An unseen category gets the next unused
+    code, so encoded predictors see a value outside the training range
+    instead of NaN.
+    """
+    X = raw[FEATURE_COLS].copy()
+    for col, codes in CATEGORY_CODES.items():
+        X[col] = X[col].map(codes).fillna(len(codes))
+    return X.astype(np.float64)
+
+
+def _decode(X: pd.DataFrame) -> pd.DataFrame:
+    raw = X.copy().astype(object)
+    for col, codes in CATEGORY_CODES.items():
+        names = {code: name for name, code in codes.items()}
+        raw[col] = X[col].round().astype(int).map(names)
+    return raw
+
+
+def edge_cases(base: pd.Series, model) -> list:
+    """Hand-picked inputs the sampled rows rarely or never contain: (case, raw row)."""
+    base = dict(base)
+    cases = []
+
+    def add(case, **changes):
+        cases.append((case, dict(base, **changes)))
+
+    # RK units
+    add("rk", BHK_OR_RK="RK", **{"BHK_NO.": 1}, SQUARE_FT=300.0)
+    add("rk", BHK_OR_RK="RK", **{"BHK_NO.": 1}, SQUARE_FT=150.0, RESALE=0, UNDER_CONSTRUCTION=1, READY_TO_MOVE=0)
+    add("rk", BHK_OR_RK="RK", **{"BHK_NO.": 2}, SQUARE_FT=450.0, POSTED_BY="Builder")
+    # extreme sizes
+    for sqft in (1.0, 25.0, 50_000.0, 1e6, 1e9):
+        add("extreme_sqft", SQUARE_FT=sqft)
+    add("extreme_sqft", **{"BHK_NO.": 20}, SQUARE_FT=1e7)
+    # categories the encoders never saw
+    add("unseen_category", POSTED_BY="Agent")
+    add("unseen_category", BHK_OR_RK="Studio")
+    add("unseen_category", POSTED_BY="Agent", BHK_OR_RK="Studio")
+    # coordinates at and beyond the edge of the training area
+    add("coordinates", LONGITUDE=68.0, LATITUDE=6.0)
+    add("coordinates", LONGITUDE=97.5, LATITUDE=37.5)
+    add("coordinates", LONGITUDE=0.0, LATITUDE=0.0)
+    add("coordinates", LONGITUDE=base["LATITUDE"], LATITUDE=base["LONGITUDE"])  # swapped, unvalidated
+    # every binary flag flipped
+    add("flags", UNDER_CONSTRUCTION=1 - base["UNDER_CONSTRUCTION"], RERA=1 - base["RERA"],
+        READY_TO_MOVE=1 - base["READY_TO_MOVE"], RESALE=1 - base["RESALE"])
+    return cases
+
+
+def threshold_cases(rows: pd.DataFrame, model, n: int = N_THRESHOLD_CASES, seed: int = SEED) -> list:
+    """
+    Rows with one feature set exactly to a split threshold of the forest.
+    Ties are where float32 casts, rounding and "<=" vs "<" mistakes show up.
+    """
+    if not hasattr(model, "estimators_"):
+        return []  # a Pipeline splits on transformed columns, not on raw features
+    rng = np.random.default_rng(seed)
+    names = list(getattr(model, "feature_names_in_", FEATURE_COLS))
+    # categorical splits (e.g. code <= 0.5) have no raw form value, so skip them
+    splits = [(est.tree_.feature[i], est.tree_.threshold[i])
+              for est in model.estimators_[:5] for i in range(est.tree_.node_count)
+              if est.tree_.children_left[i] != -1 and names[est.tree_.feature[i]] not in CATEGORY_CODES]
+    cases = []
+    for k in rng.choice(len(splits), size=min(n, len(splits)), replace=False):
+        f, t = splits[k]
+        X = rows.iloc[[rng.integers(len(rows))]].copy()
+        X[names[f]] = t
+        cases.append(("threshold_tie", _decode(X).iloc[0].to_dict()))
+    return cases
+
+
+def build_cases(model, X: pd.DataFrame = None, n_samples: int = N_SAMPLES, seed: int = SEED) -> pd.DataFrame:
+    """Sampled listings (from the encoded training data) + edge cases, as raw rows with a CASE column."""
+    if X is None:
+        from features import load_training_data
+
+        X, _ = load_training_data()
+    sample = X[FEATURE_COLS].sample(n_samples, random_state=seed)
+    raw = _decode(sample.astype(np.float64))
+    cases = [("sample", row) for row in raw.to_dict(orient="records")]
+    cases += edge_cases(raw.iloc[0], model)
+    cases += threshold_cases(sample.astype(np.float64), model, seed=seed)
+
+    frame = pd.DataFrame([row for _, row in cases], columns=FEATURE_COLS)
+    frame.insert(0, "CASE", [case for case, _ in cases])
+    return frame.reset_index(drop=True)
+
+
+def freeze_golden(model, path: str = GOLDEN_PATH, reference_input: str = "encoded",
+                  model_path: str = MODEL_PATH, X: pd.DataFrame = None,
+                  n_samples: int = N_SAMPLES, seed: int = SEED) -> dict:
+    """
+    Record the reference model's predictions for every case. The reference
+    is the joblib forest the app loads (encoded input) or any fitted
+    Pipeline that takes raw form values, like the one in app.py.
+    """
+    from model_manager import file_sha256
+
+    cases = build_cases(model, X, n_samples, seed)
+    inputs = cases[FEATURE_COLS] if reference_input == "raw" else encode_raw(cases)
+    expected = np.asarray(model.predict(inputs), dtype=np.float64)
+    golden = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "reference": {
+            "path": model_path,
+            "sha256": file_sha256(model_path) if os.path.exists(model_path) else None,
+            "input": reference_input,
+        },
+        "seed": seed,
+        "cases": [
+            {"case": c, "raw": {k: _json_value(v) for k, v in row.items()}, "expected": float(e)}
+            for c, row, e in zip(cases["CASE"], cases[FEATURE_COLS].to_dict(orient="records"), expected)
+        ],
+    }
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as fh:
+        json.dump(golden, fh, indent=1)
+    os.replace(tmp_path, path)
+    return golden
+
+
+def _json_value(v):
+    if isinstance(v, (np.integer, np.floating)):
+        return v.item()
+    return v
+
+
+def load_golden(path: str = GOLDEN_PATH):
+    """Returns (golden dict, raw frame, encoded frame, expected, case labels)."""
+    with open(path) as fh:
+        golden = json.load(fh)
+    raw = pd.DataFrame([c["raw"] for c in golden["cases"]], columns=FEATURE_COLS)
+    expected = np.array([c["expected"] for c in golden["cases"]], dtype=np.float64)
+    labels = np.array([c["case"] for c in golden["cases"]])
+    return golden, raw, encode_raw(raw), expected, labels
+
+
+# ===================== CANDIDATES =======================
+
+@dataclass
+class Candidate:
+    """
+    A predictor under test. predict takes a DataFrame (raw form values or
+    encoded features, per `input`) and returns one price per row.
+    Passes when |pred - expected| <= atol + rtol * |expected| for every case.
+    """
+    name: str
+    predict: Callable
+    input: str = "encoded"
+    atol: float = 1e-9
+    rtol: float = 1e-12
+
+
+def default_candidates(model) -> list:
+    """Every inference path in the repo that claims to match the joblib model."""
+    import atexit
+
+    from batch_pricing import score_in_chunks
+    from explainer import PathExplainer
+    from flat_forest import FlatForest
+    from forest_compaction import compact_forest
+    from shared_serving import SharedModel
+
+    flat = FlatForest.from_model(model)
+    compact = compact_forest(model)
+    explainer = PathExplainer(model)
+    shared = SharedModel.create(model)
+    atexit.register(shared.close, unlink=True)
+
+    def chunked(X):
+        prices = None
+        for _, prices in score_in_chunks(model, X, np.ones(len(X), dtype=bool), chunk_rows=64):
+            pass
+        return prices
+
+    def explained(X):
+        bias, contrib = explainer.explain(X)
+        return bias + contrib.sum(axis=1)
+
+    return [
+        Candidate("joblib model (app_web)", model.predict),
+        Candidate("FlatForest", flat.predict),
+        Candidate("shared-memory FlatForest", shared.predict),
+        Candidate("CompactForest (float32 values)", compact.predict, rtol=1e-5),
+        Candidate("batched, 64-row chunks", chunked),
+        Candidate("PathExplainer bias + contributions", explained, rtol=1e-9),
+    ]
+
+
+# ===================== CHECK + REPORT ===================
+
+def check(candidate: Candidate, raw: pd.DataFrame, encoded: pd.DataFrame, expected: np.ndarray,
+          labels: np.ndarray, repeats: int = 5, single_rows: int = 100) -> dict:
+    """Correctness on every golden case plus batch throughput and single-row latency."""
+    X = raw if candidate.input == "raw" else encoded
+    try:
+        pred = np.asarray(candidate.predict(X), dtype=np.float64)
+    except Exception as exc:  # a predictor that crashes on a golden case fails, it doesn't abort the run
+        return {"name": candidate.name, "passed": False, "cases": int(len(X)), "failures": int(len(X)),
+                "error": f"{type(exc).__name__}: {exc}"}
+    err = np.abs(pred - expected)
+    allowed = candidate.atol + candidate.rtol * np.abs(expected)
+    failed = ~(err <= allowed)  # NaN counts as a failure
+
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        candidate.predict(X)
+        timings.append(time.perf_counter() - t0)
+    single = []
+    for i in range(min(single_rows, len(X))):
+        row = X.iloc[[i]]
+        t0 = time.perf_counter()
+        candidate.predict(row)
+        single.append(time.perf_counter() - t0)
+
+    worst = int(np.nanargmax(np.where(np.isnan(err), np.inf, err)))
+    return {
+        "name": candidate.name,
+        "passed": bool(not failed.any()),
+        "cases": int(len(X)),
+        "failures": int(failed.sum()),
+        "failures_by_case": dict(Counter(labels[failed])),
+        "max_abs_err": float(np.nanmax(err)) if not np.isnan(err).all() else float("nan"),
+        "max_rel_err": float(np.nanmax(err / np.maximum(np.abs(expected), 1e-12))),
+        "worst_case": {"index": worst, "case": str(labels[worst]),
+                       "expected": float(expected[worst]), "got": float(pred[worst])},
+        "batch_rows_per_s": len(X) / min(timings),
+        "single_row_ms": float(np.median(single) * 1000),
+    }
+
+
+def run_checks(candidates: list, path: str = GOLDEN_PATH, **kwargs) -> list:
+    _, raw, encoded, expected, labels = load_golden(path)
+    return [check(c, raw, encoded, expected, labels, **kwargs) for c in candidates]
+
+
+def format_report(results: list, golden: dict = None) -> str:
+    lines = []
+    if golden is not None:
+        ref = golden["reference"]
+        counts = Counter(c["case"] for c in golden["cases"])
+        lines.append(f"🥇 Golden set: {sum(counts.values())} cases "
+                     f"({', '.join(f'{k} {v}' for k, v in counts.items())}) · reference "
+                     f"{ref['path']} {(ref['sha256'] or '')[:8]} · frozen {golden['created_at']} UTC")
+    lines.append(f"   {'predictor':<36}{'result':>8}{'max abs err':>13}{'max rel err':>13}"
+                 f"{'batch rows/s':>14}{'1-row ms':>10}")
+    for r in results:
+        if "error" in r:
+            lines.append(f"   {r['name']:<36}{'❌ error':>8}  {r['error']}")
+            continue
+        status = "✅ pass" if r["passed"] else f"❌ {r['failures']}"
+        lines.append(f"   {r['name']:<36}{status:>8}{r['max_abs_err']:>13.2e}{r['max_rel_err']:>13.2e}"
+                     f"{r['batch_rows_per_s']:>14,.0f}{r['single_row_ms']:>10.2f}")
+        if not r["passed"]:
+            w = r["worst_case"]
+            by_case = ", ".join(f"{k} {v}" for k, v in r["failures_by_case"].items())
+            lines.append(f"      failing: {by_case} · worst #{w['index']} ({w['case']}): "
+                         f"expected {w['expected']:.6f}, got {w['got']:.6f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import joblib
+
+    from model_manager import file_sha256
+
+    parser = argparse.ArgumentParser(description="Check inference paths against frozen golden predictions")
+    parser.add_argument("--golden", default=GOLDEN_PATH)
+    parser.add_argument("--freeze", action="store_true", help="(re)build the golden set from --reference")
+    parser.add_argument("--reference", default=MODEL_PATH, help="joblib file of the reference model")
+    parser.add_argument("--reference-input", choices=["encoded", "raw"], default="encoded",
+                        help="'raw' for a Pipeline that encodes categories itself (app.py)")
+    parser.add_argument("--candidate", action="append", default=[],
+                        help="extra joblib model/Pipeline to check (input kind = --reference-input)")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    reference = joblib.load(args.reference)
+    if args.freeze:
+        golden = freeze_golden(reference, args.golden, args.reference_input, args.reference)
+        print(f"🥇 Froze {len(golden['cases'])} golden cases to {args.golden}")
+
+    with open(args.golden) as fh:
+        golden = json.load(fh)
+    if golden["reference"]["sha256"] not in (None, file_sha256(args.reference)):
+        print(f"⚠️ {args.reference} is not the model this golden set was frozen from; "
+              f"re-freeze with --freeze if the change is intended.")
+
+    if args.reference_input == "raw":
+        candidates = [Candidate(f"reference ({args.reference})", reference.predict, input="raw")]
+    else:
+        candidates = default_candidates(reference)
+    for path in args.candidate:
+        candidates.append(Candidate(path, joblib.load(path).predict, input=args.reference_input))
+
+    results = run_checks(candidates, args.golden)
+    print(format_report(results, golden))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    raise SystemExit(0 if all(r["passed"] for r in results) else 1)
@@ -0,0 +1,442 @@
+import http.client
+import json
+import multiprocessing as mp
+import os
+import random
+import signal
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import auth_db
+from data_cleaning import city_from_address
+from features import DATA_PATH, MODEL_PATH, encode_features
+from geo_validation import validate_coordinates
+
+# ===================== CONFIG ===========================
+
+HOST = "127.0.0.1"
+PORT = 8700
+USER_PREFIX = "loadtest"
+USER_PASSWORD = "loadtest-pass"
+STEPS = ["login", "predict", "log", "history"]
+PERCENTILES = (50, 95, 99)
+
+
+# ===================== INPUTS ===========================
+
+def sample_inputs(n: int, path: str = DATA_PATH, seed: int = 0) -> list:
+    """
+    Realistic form submissions: encoded feature rows sampled from the
+    dataset (coordinates fixed like the app does), with the city and
+    locality the user would have typed.
+    """
+    data, _ = validate_coordinates(pd.read_csv(path), drop_invalid=True)
+    data = data.sample(n, replace=len(data) < n, random_state=seed)
+    payloads = encode_features(data).to_dict(orient="records")
+    cities = city_from_address(data["ADDRESS"])
+    areas = data["ADDRESS"].astype(str).str.split(",").str[0]
+    return [
+        {"payload": p, "city": c, "area": a}
+        for p, c, a in zip(payloads, cities, areas)
+    ]
+
+
+def ensure_users(n_users: int):
+    """One account per virtual user; existing accounts are reused."""
+    auth_db.init_db()
+    for i in range(n_users):
+        name = user_name(i)
+        auth_db.create_user(name, f"{name}@example.com", USER_PASSWORD)
+
+
+def user_name(i: int) -> str:
+    return f"{USER_PREFIX}{i:03d}"
+
+
+# ===================== TARGETS ==========================
+
+class LockError(Exception):
+    """The server reported SQLite lock contention (database is locked/busy)."""
+
+
+def is_lock_error(exc: Exception) -> bool:
+    # matched on the message: pandas.read_sql re-raises sqlite3 errors as its own DatabaseError
+    message = str(exc)
+    return isinstance(exc, LockError) or "database is locked" in message or "database is busy" in message
+
+
+class InProcessTarget:
+    """The same auth_db helpers and model call the Streamlit script makes, in this process."""
+
+    name = "in-process"
+
+    def __init__(self, model):
+        self.model = model
+
+    def login(self, username: str, password: str) -> bool:
+        return auth_db.authenticate_user(username, password)
+
+    def predict(self, payload: dict) -> float:
+        return float(self.model.predict(pd.DataFrame([payload]))[0])
+
+    def log(self, username: str, price_lacs: float, item: dict):
+        auth_db.log_prediction(username, price_lacs, item["city"], item["area"], item["payload"])
+
+    def history(self, username: str) -> int:
+        return len(auth_db.get_user_logs(username))
+
+
+class HttpTarget:
+    """Same four calls against a server started with AppServer (or --serve)."""
+
+    name = "http"
+
+    def __init__(self, address):
+        self.address = address
+
+    def _post(self, path: str, body: dict) -> dict:
+        conn = http.client.HTTPConnection(*self.address, timeout=60)
+        try:
+            conn.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            data = json.loads(resp.read() or b"{}")
+        finally:
+            conn.close()
+        if resp.status == 503:
+            raise LockError(data.get("error", "database is locked"))
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}: {data.get('error', '')}")
+        return data
+
+    def login(self, username: str, password: str) -> bool:
+        return self._post("/login", {"username": username, "password": password})["ok"]
+
+    def predict(self, payload: dict) -> float:
+        return self._post("/predict", {"payload": payload})["price_lacs"]
+
+    def log(self, username: str, price_lacs: float, item: dict):
+        self._post("/log", {"username": username, "price_lacs": price_lacs, "item": item})
+
+    def history(self, username: str) -> int:
+        return self._post("/history", {"username": username})["rows"]
+
+
+# ===================== SERVER ===========================
+
+def _make_handler(target: InProcessTarget):
+    routes = {
+        "/login": lambda b: {"ok": target.login(b["username"], b["password"])},
+        "/predict": lambda b: {"price_lacs": target.predict(b["payload"])},
+        "/log": lambda b: target.log(b["username"], b["price_lacs"], b["item"]) or {},
+        "/history": lambda b: {"rows": target.history(b["username"])},
+    }
+
+    class AppHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def do_POST(self):
+            route = routes.get(self.path)
+            if route is None:
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body, status = route(json.loads(self.rfile.read(length))), 200
+            except (KeyError, ValueError, TypeError) as exc:
+                body, status = {"error": str(exc)}, 400
+            except Exception as exc:
+                body, status = {"error": str(exc)}, 503 if is_lock_error(exc) else 500
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return AppHandler
+
+
+class _AppServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+def _serve(sock: socket.socket, ready, model_path: str, db_path: str, archive_dir: str):
+    import joblib
+
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    auth_db.DB_PATH = db_path
+    auth_db.ARCHIVE_DIR = archive_dir
+    model = joblib.load(model_path)
+    model.n_jobs = 1  # loky can't start inside a forked worker; avoid a warning per call
+    handler = _make_handler(InProcessTarget(model))
+    server = _AppServer(sock.getsockname(), handler, bind_and_activate=False)
+    server.socket = sock
+    ready.put(os.getpid())
+    server.serve_forever()
+
+
+class AppServer:
+    """
+    Local stand-in for the deployed app: n processes accepting on one
+    socket, a thread per request inside each (like Streamlit's script
+    threads), all writing to the same SQLite file.
+    """
+
+    def __init__(self, n_workers: int = 1, model_path: str = MODEL_PATH,
+                 db_path: str = auth_db.DB_PATH, archive_dir: str = auth_db.ARCHIVE_DIR,
+                 host: str = HOST, port: int = PORT):
+        self.n_workers = n_workers
+        self.model_path = model_path
+        self.db_path = db_path
+        self.archive_dir = archive_dir
+        self.ctx = mp.get_context("fork")
+        self.ready = self.ctx.Queue()
+        self.workers = []
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(256)
+        self.address = self.sock.getsockname()
+
+    def start(self, timeout_s: float = 300.0) -> "AppServer":
+        for _ in range(self.n_workers):
+            proc = self.ctx.Process(target=_serve, daemon=True,
+                                    args=(self.sock, self.ready, self.model_path, self.db_path, self.archive_dir))
+            proc.start()
+            self.workers.append(proc)
+        for _ in range(self.n_workers):
+            self.ready.get(timeout=timeout_s)
+        return self
+
+    def stop(self):
+        for proc in self.workers:
+            if proc.is_alive():
+                proc.terminate()
+        for proc in self.workers:
+            proc.join(timeout=5)
+        self.sock.close()
+
+
+# ===================== LOAD GENERATOR ===================
+
+class Recorder:
+    """Per-step latencies plus lock/error counts, shared by all virtual users."""
+
+    def __init__(self):
+        self.latency_ms = {step: [] for step in STEPS}
+        self.lock_errors = Counter()
+        self.errors = Counter()
+        self.error_samples = {}
+        self.flows = 0
+        self._lock = threading.Lock()
+
+    def timed(self, step: str, fn, *args):
+        """Run one app call. Returns (ok, result); failures are counted, not raised."""
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception as exc:
+            if is_lock_error(exc):
+                with self._lock:
+                    self.lock_errors[step] += 1
+            else:
+                self.error(step, f"{type(exc).__name__}: {exc}")
+            return False, None
+        self.latency_ms[step].append((time.perf_counter() - t0) * 1000)
+        return True, result
+
+    def error(self, step: str, message: str):
+        with self._lock:
+            self.errors[step] += 1
+            self.error_samples.setdefault(step, message)
+
+    def flow_done(self):
+        with self._lock:
+            self.flows += 1
+
+
+def virtual_user(target, index: int, inputs: list, stop_at: float, recorder: Recorder,
+                 think_s: float = 0.5, predictions_per_flow: int = 3, seed: int = 0):
+    """
+    One simulated user repeating: login → (think → predict → log) × k →
+    think → history, until stop_at. Think times are exponential with
+    mean think_s, so arrivals are not lock-stepped across users.
+    """
+    rng = random.Random(seed + index)
+    username = user_name(index)
+
+    def think():
+        if think_s > 0:
+            time.sleep(rng.expovariate(1.0 / think_s))
+
+    while time.perf_counter() < stop_at:
+        ok, allowed = recorder.timed("login", target.login, username, USER_PASSWORD)
+        if not ok or not allowed:
+            if ok:
+                recorder.error("login", f"login rejected for {username}")
+            think()
+            continue
+        for _ in range(predictions_per_flow):
+            think()
+            item = rng.choice(inputs)
+            ok, price = recorder.timed("predict", target.predict, item["payload"])
+            if ok:
+                recorder.timed("log", target.log, username, price, item)
+        think()
+        recorder.timed("history", target.history, username)
+        recorder.flow_done()
+
+
+def run_load(target, n_users: int, duration_s: float, inputs: list, think_s: float = 0.5,
+             predictions_per_flow: int = 3, seed: int = 0) -> dict:
+    """Run n_users virtual users (threads) for duration_s and return a report dict."""
+    recorder = Recorder()
+    stop_at = time.perf_counter() + duration_s
+    threads = [
+        threading.Thread(target=virtual_user, daemon=True,
+                         args=(target, i, inputs, stop_at, recorder, think_s, predictions_per_flow, seed))
+        for i in range(n_users)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    steps = {}
+    for step, values in recorder.latency_ms.items():
+        values = np.asarray(values)
+        pct = np.percentile(values, PERCENTILES) if len(values) else [float("nan")] * len(PERCENTILES)
+        steps[step] = {
+            "ok": int(len(values)),
+            **{f"p{p}_ms": float(v) for p, v in zip(PERCENTILES, pct)},
+            "max_ms": float(values.max()) if len(values) else float("nan"),
+            "lock_errors": recorder.lock_errors[step],
+            "errors": recorder.errors[step],
+        }
+    calls = sum(s["ok"] for s in steps.values())
+    return {
+        "target": target.name,
+        "users": n_users,
+        "elapsed_s": elapsed,
+        "think_s": think_s,
+        "flows": recorder.flows,
+        "flows_per_s": recorder.flows / elapsed,
+        "calls_per_s": calls / elapsed,
+        "lock_errors": sum(recorder.lock_errors.values()),
+        "errors": sum(recorder.errors.values()),
+        "error_samples": recorder.error_samples,
+        "steps": steps,
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"🎯 {report['target']}: {report['users']} users, {report['elapsed_s']:.1f}s, "
+        f"mean think {report['think_s'] * 1000:.0f} ms",
+        f"   {report['flows']:,} flows ({report['flows_per_s']:.1f}/s) · "
+        f"{report['calls_per_s']:.1f} calls/s · "
+        f"SQLite lock errors {report['lock_errors']} · other errors {report['errors']}",
+        f"   {'step':<9}{'ok':>8}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES)
+        + f"{'max ms':>10}{'locked':>8}{'errors':>8}",
+    ]
+    for step, s in report["steps"].items():
+        lines.append(
+            f"   {step:<9}{s['ok']:>8,}" + "".join(f"{s[f'p{p}_ms']:>10.1f}" for p in PERCENTILES)
+            + f"{s['max_ms']:>10.1f}{s['lock_errors']:>8}{s['errors']:>8}"
+        )
+    for step, msg in report["error_samples"].items():
+        lines.append(f"   ⚠️ {step}: {msg}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Simulate concurrent app users: login → predict → log → history")
+    parser.add_argument("--mode", choices=["inproc", "http", "both"], default="both")
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per run")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="mean think time between actions")
+    parser.add_argument("--predictions", type=int, default=3, help="predictions per login")
+    parser.add_argument("--server-workers", type=int, default=2, help="processes for the launched server")
+    parser.add_argument("--connect", default=None, help="HOST:PORT of an already running --serve instance")
+    parser.add_argument("--serve", action="store_true", help="only run the app server (for another machine's load)")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--db", default=None, help="SQLite file to use (default: a fresh temp file per run)")
+    parser.add_argument("--sqlite-timeout", type=float, default=auth_db.SQLITE_TIMEOUT_S,
+                        help="seconds a connection waits on a lock before 'database is locked'")
+    parser.add_argument("--json", default=None, help="also write the reports to this file")
+    args = parser.parse_args()
+
+    auth_db.SQLITE_TIMEOUT_S = args.sqlite_timeout
+
+    def fresh_db(label):
+        # an empty archive next to the scratch DB, so history reads never touch ./audit_archive
+        tmp = tempfile.mkdtemp()
+        path = args.db or os.path.join(tmp, f"loadtest-{label}.db")
+        auth_db.DB_PATH = path
+        auth_db.ARCHIVE_DIR = os.path.join(tmp, "audit_archive")
+        ensure_users(args.users)
+        return path
+
+    if args.serve:
+        server = AppServer(args.server_workers, db_path=fresh_db("serve"), archive_dir=auth_db.ARCHIVE_DIR,
+                           port=args.port).start()
+        print(f"🚀 App server on http://{server.address[0]}:{server.address[1]} "
+              f"({args.server_workers} workers, db {auth_db.DB_PATH})")
+        try:
+            signal.pause()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+        raise SystemExit
+
+    inputs = sample_inputs(5_000)
+    think_s = args.think_ms / 1000
+    reports = []
+
+    if args.mode in ("inproc", "both"):
+        fresh_db("inproc")
+        model = joblib.load(MODEL_PATH)
+        model.n_jobs = 1  # one joblib pool per predict call from every user thread only adds overhead
+        target = InProcessTarget(model)
+        reports.append(run_load(target, args.users, args.duration, inputs, think_s, args.predictions))
+        print(format_report(reports[-1]))
+
+    if args.mode in ("http", "both"):
+        if args.connect:
+            host, port = args.connect.rsplit(":", 1)
+            reports.append(run_load(HttpTarget((host, int(port))), args.users, args.duration,
+                                    inputs, think_s, args.predictions))
+        else:
+            server = AppServer(args.server_workers, db_path=fresh_db("http"), archive_dir=auth_db.ARCHIVE_DIR,
+                               port=0).start()
+            try:
+                reports.append(run_load(HttpTarget(server.address), args.users, args.duration,
+                                        inputs, think_s, args.predictions))
+            finally:
+                server.stop()
+        print(format_report(reports[-1]))
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(reports, fh, indent=2)
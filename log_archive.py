@@ -0,0 +1,511 @@
+import glob
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# ===================== CONFIG ===========================
+
+DB_PATH = "auth_logs.db"
+ARCHIVE_DIR = "audit_archive"
+RETENTION_DAYS = 90
+BASE_COLS = ("id", "username", "ts", "price_lacs", "city", "area")
+INDEX_FILE = "index.json"   # {partition path relative to the archive: [usernames]}
+
+# Per-row state of a payload key, stored as an int8 m:<key> column next to
+# its p:<key> (typed) or j:<key> (JSON text) values column.
+KEY_MISSING, KEY_VALUE, KEY_NULL = 0, 1, 2
+
+
+# ===================== COLUMN ENCODING ==================
+
+def _encode_key(payloads: list, key: str) -> dict:
+    """
+    Columns for one payload key: an m:<key> state mask plus the values.
+
+    Values are bool, int64, float64 or str when every present value has
+    that type (rows without a value hold a filler the mask hides), and
+    JSON text under j:<key> for anything mixed or nested.
+    """
+    missing = object()
+    raw = [p.get(key, missing) for p in payloads]
+    state = np.asarray(
+        [KEY_MISSING if v is missing else KEY_NULL if v is None else KEY_VALUE for v in raw], dtype=np.int8
+    )
+    values = [v for v in raw if v is not missing and v is not None]
+
+    def filled(fill):
+        return [fill if v is missing or v is None else v for v in raw]
+
+    if all(isinstance(v, bool) for v in values):
+        return {f"m:{key}": state, f"p:{key}": np.asarray(filled(False), dtype=bool)}
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return {f"m:{key}": state, f"p:{key}": np.asarray(filled(0), dtype=np.int64)}
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return {f"m:{key}": state, f"p:{key}": np.asarray(filled(np.nan), dtype=np.float64)}
+    if all(isinstance(v, str) for v in values):
+        return {f"m:{key}": state, f"p:{key}": np.asarray(filled(""), dtype=str)}
+    return {f"m:{key}": state, f"j:{key}": np.asarray([json.dumps(v) for v in filled(None)], dtype=str)}
+
+
+def _decode_payloads(cols: dict, n_rows: int) -> list:
+    """JSON payload strings back from the m:/p:/j: columns."""
+    payloads = [{} for _ in range(n_rows)]
+    for name in cols:
+        if not name.startswith("m:"):
+            continue
+        key = name[2:]
+        state = cols[name]
+        if f"p:{key}" in cols:
+            values = cols[f"p:{key}"].tolist()
+        else:
+            values = [json.loads(v) for v in cols[f"j:{key}"].tolist()]
+        for i in np.flatnonzero(state != KEY_MISSING).tolist():
+            payloads[i][key] = values[i] if state[i] == KEY_VALUE else None
+    return [json.dumps(p) for p in payloads]
+
+
+def _decode_legacy_payloads(cols: dict, payload_keys: list) -> list:
+    """Partitions written before the m: masks: NaN / "" meant missing."""
+    payload_df = pd.DataFrame({k[2:]: cols[k] for k in payload_keys})
+    return [
+        json.dumps({k: v for k, v in rec.items() if v == v and v != ""})
+        for rec in payload_df.to_dict("records")
+    ]
+
+
+def _rows_to_columns(rows) -> dict:
+    """audit_logs rows -> dict of typed arrays, payload keys expanded to p:<key> columns."""
+    cols = {
+        "id": np.asarray([r["id"] for r in rows], dtype=np.int64),
+        "username": np.asarray([r["username"] for r in rows], dtype=str),
+        "ts": np.asarray([r["ts"] for r in rows], dtype="datetime64[us]"),
+        "price_lacs": np.asarray([r["price_lacs"] for r in rows], dtype=np.float64),
+        "city": np.asarray([r["city"] or "" for r in rows], dtype=str),
+        "area": np.asarray([r["area"] or "" for r in rows], dtype=str),
+    }
+    payloads = [json.loads(r["payload"]) if r["payload"] else {} for r in rows]
+    keys = sorted({k for p in payloads for k in p})
+    for key in keys:
+        cols.update(_encode_key(payloads, key))
+    return cols
+
+
+def _columns_to_frame(cols, with_payload: bool = True) -> pd.DataFrame:
+    """Typed partition columns -> the same shape as rows read from SQLite."""
+    payload_keys = [k for k in cols if k.startswith("p:")] if with_payload else []
+    if not with_payload:
+        payloads = None
+    elif any(k.startswith("m:") for k in cols):
+        payloads = _decode_payloads(cols, len(cols["id"]))
+    elif payload_keys:
+        payloads = _decode_legacy_payloads(cols, payload_keys)
+    else:
+        payloads = ["{}"] * len(cols["id"])
+    frame = pd.DataFrame({
+        "id": cols["id"],
+        "username": cols["username"],
+        "ts": pd.to_datetime(cols["ts"]).strftime("%Y-%m-%dT%H:%M:%S.%f"),
+        "price_lacs": cols["price_lacs"],
+        "city": pd.Series(cols["city"]).replace("", None),
+        "area": pd.Series(cols["area"]).replace("", None),
+    })
+    if with_payload:
+        frame["payload"] = payloads
+    return frame
+
+
+# ===================== ARCHIVE JOB ======================
+
+def _partition_path(archive_dir: str, day: str, first_id: int, last_id: int) -> str:
+    return os.path.join(archive_dir, f"date={day}", f"part-{first_id:012d}-{last_id:012d}.npz")
+
+
+def _load_index(archive_dir: str) -> dict:
+    try:
+        with open(os.path.join(archive_dir, INDEX_FILE)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(archive_dir: str, index: dict):
+    path = os.path.join(archive_dir, INDEX_FILE)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as fh:
+        json.dump(index, fh)
+    os.replace(tmp_path, path)
+
+
+_index_cache = {}
+
+
+def _users_index(archive_dir: str):
+    """
+    (username -> set of partition paths, set of indexed paths) from the
+    archive's index file. Cached by mtime, so a render costs one stat()
+    unless the archive job ran. Partitions missing from the index (e.g. a
+    crash between writing a file and the index) are simply not pruned.
+    """
+    path = os.path.join(archive_dir, INDEX_FILE)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}, set()
+    cached = _index_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        by_user, indexed = {}, set()
+        for rel, users in _load_index(archive_dir).items():
+            full = os.path.join(archive_dir, rel)
+            indexed.add(full)
+            for user in users:
+                by_user.setdefault(user, set()).add(full)
+        cached = (mtime, by_user, indexed)
+        _index_cache[path] = cached
+    return cached[1], cached[2]
+
+
+def ensure_incremental_vacuum(conn):
+    """Switch the DB to auto_vacuum=INCREMENTAL once (needs one full VACUUM)."""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+
+
+def archive_old_logs(db_path: str = DB_PATH, archive_dir: str = ARCHIVE_DIR,
+                     retention_days: int = RETENTION_DAYS, now: datetime = None) -> dict:
+    """
+    Move audit_logs rows older than the retention window into compressed,
+    date-partitioned .npz files, delete them from SQLite and give the freed
+    pages back to the filesystem.
+
+    Files are written before rows are deleted. The cutoff is a day
+    boundary, so a day is archived in one go, and any earlier partition
+    starting at the same id is replaced rather than kept next to the new
+    one. Re-running after a crash therefore rewrites the same rows
+    instead of duplicating them.
+    """
+    now = now or datetime.utcnow()
+    cutoff_day = (now - timedelta(days=retention_days)).date()
+    cutoff = datetime(cutoff_day.year, cutoff_day.month, cutoff_day.day).isoformat()
+    size_before = os.path.getsize(db_path)
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    try:
+        ensure_incremental_vacuum(conn)
+        rows = conn.execute(
+            "SELECT id, username, ts, price_lacs, city, area, payload FROM audit_logs "
+            "WHERE ts < ? ORDER BY id",
+            (cutoff,),
+        ).fetchall()
+
+        by_day = {}
+        for r in rows:
+            by_day.setdefault(r["ts"][:10], []).append(r)
+
+        files = []
+        index = _load_index(archive_dir)
+        for day, day_rows in by_day.items():
+            cols = _rows_to_columns(day_rows)
+            path = _partition_path(archive_dir, day, int(cols["id"][0]), int(cols["id"][-1]))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # a crashed earlier run may have left a partition over the same rows
+            for stale in glob.glob(os.path.join(os.path.dirname(path), f"part-{int(cols['id'][0]):012d}-*.npz")):
+                if stale != path:
+                    os.remove(stale)
+                    index.pop(os.path.relpath(stale, archive_dir), None)
+            tmp_path = path + ".tmp.npz"
+            np.savez_compressed(tmp_path, **cols)
+            os.replace(tmp_path, path)
+            index[os.path.relpath(path, archive_dir)] = sorted(set(cols["username"].tolist()))
+            files.append(path)
+        if files:
+            _save_index(archive_dir, index)
+
+        if rows:
+            conn.execute("BEGIN")
+            conn.executemany("DELETE FROM audit_logs WHERE id = ?", [(r["id"],) for r in rows])
+            conn.execute("COMMIT")
+            # executescript steps the pragma to completion; execute() frees a single page
+            conn.executescript("PRAGMA incremental_vacuum;")
+    finally:
+        conn.close()
+
+    return {
+        "archived_rows": len(rows),
+        "partitions": len(files),
+        "db_bytes_before": size_before,
+        "db_bytes_after": os.path.getsize(db_path),
+        "cutoff": cutoff,
+    }
+
+
+# ===================== QUERY HELPERS ====================
+
+def _partition_files(archive_dir: str, since: str = None, until: str = None):
+    """Partition files newest day first, pruned by day from the directory name."""
+    days = sorted(glob.glob(os.path.join(archive_dir, "date=*")), reverse=True)
+    for day_dir in days:
+        day = os.path.basename(day_dir)[len("date="):]
+        if since and day < since[:10]:
+            continue
+        if until and day > until[:10]:
+            continue
+        yield from sorted(glob.glob(os.path.join(day_dir, "part-*.npz")), reverse=True)
+
+
+def _read_partition(path: str, username: str = None, with_payload: bool = True) -> pd.DataFrame:
+    with np.load(path) as npz:
+        keep = None
+        if username is not None:
+            # npz members decompress on access: check usernames before touching the rest
+            keep = npz["username"] == username
+            if not keep.any():
+                return None
+        cols = {k: npz[k] for k in npz.files if with_payload or k[:2] not in ("p:", "m:", "j:")}
+    if keep is not None:
+        cols = {k: v[keep] for k, v in cols.items()}
+    return _columns_to_frame(cols, with_payload)
+
+
+def query_logs(conn, archive_dir: str = ARCHIVE_DIR, username: str = None,
+               since: str = None, until: str = None, limit: int = None,
+               with_payload: bool = True) -> pd.DataFrame:
+    """
+    audit_logs rows from SQLite plus archived partitions, newest first.
+
+    since/until are ISO timestamps. With a limit, partitions are read
+    newest-first and reading stops as soon as enough rows are collected.
+    with_payload=False skips the JSON column, which is most of the cost
+    for analytics over long ranges.
+    """
+    where, params = [], []
+    if username is not None:
+        where.append("username = ?")
+        params.append(username)
+    if since:
+        where.append("ts >= ?")
+        params.append(since)
+    if until:
+        where.append("ts < ?")
+        params.append(until)
+    sql = "SELECT id, username, ts, price_lacs, city, area" + (", payload" if with_payload else "") + " FROM audit_logs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY ts DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    hot = pd.read_sql_query(sql, conn, params=params)
+
+    frames, have = [hot], len(hot)
+    if not limit or have < limit:
+        if username is not None:
+            by_user, indexed = _users_index(archive_dir)
+            mine = by_user.get(username, set())
+        for path in _partition_files(archive_dir, since, until):
+            if username is not None and path in indexed and path not in mine:
+                continue  # the index says this user has no rows here
+            part = _read_partition(path, username, with_payload)
+            if part is None:
+                continue
+            if since:
+                part = part[part["ts"] >= since]
+            if until:
+                part = part[part["ts"] < until]
+            frames.append(part)
+            have += len(part)
+            if limit and have >= limit:
+                break
+
+    out = pd.concat([f for f in frames if len(f)], ignore_index=True) if have else hot
+    out = out.drop_duplicates("id")
+    out = out.sort_values("ts", ascending=False)
+    return out.head(limit) if limit else out
+
+
+def recent_logs(conn, username: str, limit: int = 50, archive_dir: str = ARCHIVE_DIR) -> list:
+    """Drop-in for get_user_logs(): list of row dicts, newest first."""
+    return query_logs(conn, archive_dir, username=username, limit=limit).to_dict("records")
+
+
+# ===================== ROUND-TRIP CHECK =================
+
+def roundtrip_check() -> bool:
+    """
+    Log a mix of single predictions and portfolio uploads through auth_db,
+    archive them all and check every payload comes back with the same keys,
+    values and JSON types.
+    """
+    import tempfile
+
+    import auth_db
+
+    tmp = tempfile.mkdtemp()
+    archive_dir = os.path.join(tmp, "archive")
+    db_before = auth_db.DB_PATH
+    auth_db.DB_PATH = os.path.join(tmp, "logs.db")
+    try:
+        auth_db.init_db()
+        single = {
+            "POSTED_BY": 2, "UNDER_CONSTRUCTION": 0, "RERA": 1, "BHK_NO.": 2, "BHK_OR_RK": 0,
+            "SQUARE_FT": 1000, "READY_TO_MOVE": 1, "RESALE": 1, "LONGITUDE": 77.59, "LATITUDE": 12.97,
+        }
+        auth_db.log_prediction("alice", 81.5, "Bengaluru", "Indiranagar", single)
+        auth_db.log_prediction("alice", 64.25, "Pune", "Baner", dict(single, SQUARE_FT=850, LATITUDE=18.5))
+        rows = pd.DataFrame([single] * 3)
+        full = {"batch": True, "file": "portfolio.csv", "rows": 3, "priced": 3, "invalid": 0,
+                "swapped_coords": 1, "mean_price_lacs": 70.2, "median_price_lacs": 69.0,
+                "min_price_lacs": 60.0, "max_price_lacs": 81.5, "elapsed_s": 0.012}
+        empty = dict(full, file="all_invalid.csv", priced=0, invalid=3, mean_price_lacs=None,
+                     median_price_lacs=None, min_price_lacs=None, max_price_lacs=None)
+        auth_db.log_batch_prediction("alice", full, rows)
+        auth_db.log_batch_prediction("bob", empty, rows)
+
+        with auth_db.get_conn() as conn:
+            before = pd.read_sql_query("SELECT id, payload FROM audit_logs", conn)
+        archive_old_logs(auth_db.DB_PATH, archive_dir, retention_days=0, now=datetime.utcnow() + timedelta(days=2))
+        with auth_db.get_conn() as conn:
+            after = query_logs(conn, archive_dir)
+    finally:
+        auth_db.DB_PATH = db_before
+
+    expected = {i: json.loads(p) for i, p in zip(before["id"], before["payload"])}
+    got = {i: json.loads(p) for i, p in zip(after["id"], after["payload"])}
+
+    def typed(payload):
+        return {k: (type(v).__name__, v) for k, v in payload.items()}
+
+    bad = [i for i in expected if i not in got or typed(got[i]) != typed(expected[i])]
+    for i in bad:
+        print(f"   ❌ id {i}: {expected[i]} -> {got.get(i)}")
+    print(f"{'✅' if not bad else '❌'} Archive round-trip: {len(expected) - len(bad)}/{len(expected)} payloads identical")
+    shutil.rmtree(tmp, ignore_errors=True)
+    return not bad
+
+
+# ===================== BENCHMARK ========================
+
+def _make_synthetic_db(path: str, n_rows: int, days: int, n_users: int = 200):
+    rng = np.random.default_rng(0)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE audit_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL, "
+        "ts TEXT NOT NULL, price_lacs REAL NOT NULL, city TEXT, area TEXT, payload TEXT)"
+    )
+    start = datetime.utcnow() - timedelta(days=days)
+    offsets = np.sort(rng.uniform(0, days * 86400, n_rows))
+    cities = ["Bengaluru", "Mumbai", "Delhi NCR", "Hyderabad", "Chennai", "Pune"]
+    rows = []
+    for i in range(n_rows):
+        payload = {
+            "POSTED_BY": int(rng.integers(0, 3)), "UNDER_CONSTRUCTION": 0, "RERA": int(rng.integers(0, 2)),
+            "BHK_NO.": int(rng.integers(1, 5)), "BHK_OR_RK": 0, "SQUARE_FT": int(rng.integers(400, 3000)),
+            "READY_TO_MOVE": 1, "RESALE": 1, "LONGITUDE": float(rng.uniform(72, 88)),
+            "LATITUDE": float(rng.uniform(10, 28)),
+        }
+        rows.append((f"user{rng.integers(n_users)}", (start + timedelta(seconds=float(offsets[i]))).isoformat(),
+                     float(rng.uniform(20, 400)), cities[i % len(cities)], "Somewhere", json.dumps(payload)))
+    conn.executemany(
+        "INSERT INTO audit_logs (username, ts, price_lacs, city, area, payload) VALUES (?, ?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def _time_ms(fn, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return float(np.median(timings) * 1000)
+
+
+def benchmark(n_rows: int = 200_000, days: int = 365):
+    import tempfile
+
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "logs.db")
+    archive_dir = os.path.join(tmp, "archive")
+    _make_synthetic_db(db_path, n_rows, days)
+
+    def history():
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        recent_logs(conn, "user7", archive_dir=archive_dir)
+        conn.close()
+
+    def history_new_user():
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        recent_logs(conn, "new_user", archive_dir=archive_dir)
+        conn.close()
+
+    def city_avg_90d():
+        conn = sqlite3.connect(db_path)
+        since = (datetime.utcnow() - timedelta(days=90)).isoformat()
+        conn.execute("SELECT city, AVG(price_lacs) FROM audit_logs WHERE ts >= ? GROUP BY city", (since,)).fetchall()
+        conn.close()
+
+    def full_year_via_helper():
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        query_logs(conn, archive_dir, with_payload=False).groupby("city")["price_lacs"].mean()
+        conn.close()
+
+    before = {
+        "db": os.path.getsize(db_path),
+        "history": _time_ms(history),
+        "history_new": _time_ms(history_new_user),
+        "city_90d": _time_ms(city_avg_90d),
+        "full": _time_ms(full_year_via_helper, repeats=1),
+    }
+    t0 = time.perf_counter()
+    report = archive_old_logs(db_path, archive_dir, retention_days=RETENTION_DAYS)
+    took = time.perf_counter() - t0
+    archive_bytes = sum(os.path.getsize(p) for p in glob.glob(os.path.join(archive_dir, "*", "*.npz")))
+    after = {
+        "db": os.path.getsize(db_path),
+        "history": _time_ms(history),
+        "history_new": _time_ms(history_new_user),
+        "city_90d": _time_ms(city_avg_90d),
+        "full": _time_ms(full_year_via_helper, repeats=1),
+    }
+
+    mb = 1024 * 1024
+    print(f"🗄️ {n_rows:,} rows over {days} days, retention {RETENTION_DAYS} days")
+    print(f"   archived {report['archived_rows']:,} rows into {report['partitions']} partitions in {took:.1f}s")
+    print(f"   DB size          : {before['db'] / mb:8.1f} MB -> {after['db'] / mb:.1f} MB "
+          f"(+ {archive_bytes / mb:.1f} MB archive)")
+    print(f"   user history     : {before['history']:8.1f} ms -> {after['history']:.1f} ms")
+    print(f"   no-history user  : {before['history_new']:8.1f} ms -> {after['history_new']:.1f} ms")
+    print(f"   90-day city avg  : {before['city_90d']:8.1f} ms -> {after['city_90d']:.1f} ms")
+    print(f"   full-year (hot+archive) analytics: {before['full']:.0f} ms -> {after['full']:.0f} ms")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive old audit_logs rows to compressed partitions")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--retention-days", type=int, default=RETENTION_DAYS)
+    parser.add_argument("--benchmark", action="store_true", help="run on a synthetic 200k-row DB instead")
+    parser.add_argument("--check", action="store_true", help="archive mixed sample rows and compare payloads")
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(0 if roundtrip_check() else 1)
+    if args.benchmark:
+        benchmark()
+    else:
+        result = archive_old_logs(args.db, args.archive_dir, args.retention_days)
+        print(f"🗄️ Archived {result['archived_rows']} rows older than {result['cutoff']} "
+              f"into {result['partitions']} partitions")
+        print(f"📦 DB size: {result['db_bytes_before'] / 1024:.0f} KB -> {result['db_bytes_after'] / 1024:.0f} KB")
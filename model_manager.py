@@ -0,0 +1,203 @@
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from features import MODEL_PATH, TARGET_COL
+
+# ===================== CONFIG ===========================
+
+CANARY_PATH = "house_price_canary.csv"
+POLL_INTERVAL_S = 2.0
+MAX_MAE_REGRESSION = 0.10  # reject a new model whose canary MAE is >10% worse
+
+
+# ===================== HELPERS ==========================
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def save_model_atomic(model, path: str = MODEL_PATH, compress: int = 3):
+    """Write to a temp file then rename, so watchers never see half a pickle."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    joblib.dump(model, tmp_path, compress=compress)
+    os.replace(tmp_path, path)
+
+
+@dataclass
+class ModelVersion:
+    model: object
+    sha256: str
+    mtime: float
+    loaded_at: datetime = field(default_factory=datetime.utcnow)
+    canary_mae: float = float("nan")
+
+    @property
+    def short_id(self) -> str:
+        return self.sha256[:8]
+
+
+# ===================== MODEL MANAGER ====================
+
+class ModelManager:
+    """
+    Holds the live model and swaps in new artifacts without a restart.
+
+    A background thread polls the artifact's mtime. When it changes and the
+    content hash is new, it loads the file, warms it up and scores it on the
+    canary set. Only a model that passes the check is swapped in, and the
+    swap is one reference assignment. Callers that already hold the old
+    model keep using it until their prediction returns. The replaced version
+    is kept so rollback() can restore it instantly.
+    """
+
+    def __init__(self, path: str = MODEL_PATH, canary_path: str = CANARY_PATH,
+                 poll_interval_s: float = POLL_INTERVAL_S,
+                 max_mae_regression: float = MAX_MAE_REGRESSION):
+        self.path = path
+        self.canary_path = canary_path
+        self.poll_interval_s = poll_interval_s
+        self.max_mae_regression = max_mae_regression
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._canary = None
+        self._seen_mtime = None
+        self.previous = None
+        self.last_error = None
+        self.events = []  # (utc time, message), newest last
+
+        self.current = self._load_version()
+        self._seen_mtime = self.current.mtime
+        self._log(f"loaded {self.current.short_id}")
+
+    # ---------- public API ----------
+
+    def get(self):
+        """The model to predict with. Hold on to it for the whole request."""
+        return self.current.model
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval_s * 2)
+
+    def rollback(self) -> bool:
+        """Swap back to the previous version. Returns False if there is none."""
+        with self._lock:
+            if self.previous is None:
+                return False
+            self.current, self.previous = self.previous, self.current
+        self._log(f"rolled back to {self.current.short_id}")
+        return True
+
+    def check_now(self) -> bool:
+        """Run one watch cycle synchronously. Returns True if a new model was swapped in."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._seen_mtime:
+            return False
+        self._seen_mtime = mtime
+
+        sha = file_sha256(self.path)
+        if sha == self.current.sha256:
+            return False
+
+        try:
+            candidate = self._load_version(sha=sha, mtime=mtime)
+            self._validate(candidate)
+        except Exception as exc:  # keep serving the current model on any failure
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            self._log(f"rejected {sha[:8]} ({self.last_error})")
+            return False
+
+        with self._lock:
+            self.previous, self.current = self.current, candidate
+        self.last_error = None
+        self._log(f"swapped in {candidate.short_id} (canary MAE {candidate.canary_mae:.2f})")
+        return True
+
+    def status(self) -> dict:
+        return {
+            "current": self.current.short_id,
+            "loaded_at": self.current.loaded_at.isoformat(timespec="seconds"),
+            "canary_mae": self.current.canary_mae,
+            "previous": self.previous.short_id if self.previous else None,
+            "last_error": self.last_error,
+        }
+
+    # ---------- internals ----------
+
+    def _log(self, message: str):
+        self.events.append((datetime.utcnow(), message))
+        del self.events[:-20]
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval_s):
+            self.check_now()
+
+    def _load_canary(self):
+        if self._canary is None and os.path.exists(self.canary_path):
+            canary = pd.read_csv(self.canary_path)
+            self._canary = (canary.drop(columns=[TARGET_COL]), canary[TARGET_COL].to_numpy())
+        return self._canary
+
+    def _canary_mae(self, model) -> float:
+        canary = self._load_canary()
+        if canary is None:
+            return float("nan")
+        X, y = canary
+        pred = np.asarray(model.predict(X), dtype=np.float64)
+        if not np.isfinite(pred).all():
+            raise ValueError("non-finite predictions on canary set")
+        return float(np.abs(pred - y).mean())
+
+    def _load_version(self, sha: str = None, mtime: float = None) -> ModelVersion:
+        if mtime is None:
+            mtime = os.path.getmtime(self.path)
+        if sha is None:
+            sha = file_sha256(self.path)
+        model = joblib.load(self.path)
+        version = ModelVersion(model=model, sha256=sha, mtime=mtime)
+        # scoring the canary set also warms the model up before it goes live
+        version.canary_mae = self._canary_mae(model)
+        return version
+
+    def _validate(self, candidate: ModelVersion):
+        old, new = self.current.canary_mae, candidate.canary_mae
+        if np.isnan(new) or np.isnan(old):
+            return
+        if new > old * (1 + self.max_mae_regression):
+            raise ValueError(f"canary MAE {new:.2f} is worse than current {old:.2f}")
+
+
+if __name__ == "__main__":
+    manager = ModelManager().start()
+    print("👀 Watching", manager.path, manager.status())
+    try:
+        while True:
+            time.sleep(5)
+            print(manager.status())
+    except KeyboardInterrupt:
+        manager.stop()
@@ -0,0 +1,295 @@
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import city_from_address, clean_dataset
+from features import DATA_PATH, FEATURE_COLS, MODEL_PATH, encode_features
+from geo_validation import validate_coordinates
+
+# ===================== CONFIG ===========================
+
+SURFACE_PATH = "house_price_surface.npy"   # metadata sits next to it as .json
+GRID_SIZE = 96              # grid points per axis per city
+MIN_CITY_ROWS = 150         # cities with fewer listings get no surface
+BOX_QUANTILES = (0.1, 0.9)  # city extent from the middle 80% of its listings...
+BOX_MARGIN = 0.25           # ...widened by 25% on each side...
+HALF_SPAN_DEG = (0.08, 0.4)  # ...and kept between ~9 km and ~45 km from the centre
+BHK_CONFIGS = (1, 2, 3, 4)
+
+
+def meta_path(path: str = SURFACE_PATH) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+# ===================== BUILD ============================
+
+def load_listings(path: str = DATA_PATH) -> pd.DataFrame:
+    data, _ = validate_coordinates(pd.read_csv(path), drop_invalid=True)
+    data, _ = clean_dataset(data)
+    return data
+
+
+def city_boxes(data: pd.DataFrame, min_rows: int = MIN_CITY_ROWS) -> list:
+    """A lon/lat box per city with enough listings, robust to stray coordinates."""
+    city = city_from_address(data["ADDRESS"])
+    counts = city.value_counts()
+    boxes = []
+    for name, n in counts[counts >= min_rows].items():
+        pts = data.loc[city == name, ["LONGITUDE", "LATITUDE"]]
+        lo, hi = pts.quantile(BOX_QUANTILES[0]), pts.quantile(BOX_QUANTILES[1])
+        centre = pts.median()
+        half = ((hi - lo) / 2 * (1 + 2 * BOX_MARGIN)).clip(*HALF_SPAN_DEG)
+        boxes.append({
+            "city": name,
+            "rows": int(n),
+            "lon": [float(centre["LONGITUDE"] - half["LONGITUDE"]), float(centre["LONGITUDE"] + half["LONGITUDE"])],
+            "lat": [float(centre["LATITUDE"] - half["LATITUDE"]), float(centre["LATITUDE"] + half["LATITUDE"])],
+        })
+    return boxes
+
+
+def common_configs(data: pd.DataFrame, bhk_values=BHK_CONFIGS) -> list:
+    """
+    Typical listing per BHK count: median size for that BHK, every other
+    feature at its most common value (encoded the way the model expects).
+    """
+    X = encode_features(data)
+    base = X.mode().iloc[0]
+    configs = []
+    for bhk in bhk_values:
+        sqft = float(np.round(X.loc[X["BHK_NO."] == bhk, "SQUARE_FT"].median() / 50) * 50)
+        row = {c: float(base[c]) for c in FEATURE_COLS if c not in ("LONGITUDE", "LATITUDE")}
+        row.update({"BHK_NO.": float(bhk), "SQUARE_FT": sqft})
+        configs.append({"label": f"{bhk} BHK · {sqft:,.0f} sq ft", "features": row})
+    return configs
+
+
+def build_surface(model, data: pd.DataFrame = None, grid_size: int = GRID_SIZE):
+    """
+    Evaluate the model on a grid_size x grid_size lon/lat grid per city for
+    each common configuration. One model.predict call per city covers every
+    configuration at once.
+
+    Returns (grid, meta): grid is float32 shaped
+    (n_cities, n_configs, grid_size [lat], grid_size [lon]).
+    """
+    data = load_listings() if data is None else data
+    boxes = city_boxes(data)
+    configs = common_configs(data)
+    feature_names = list(getattr(model, "feature_names_in_", FEATURE_COLS))
+
+    grid = np.empty((len(boxes), len(configs), grid_size, grid_size), dtype=np.float32)
+    n_cells = grid_size * grid_size
+    for ci, box in enumerate(boxes):
+        lons = np.linspace(*box["lon"], grid_size)
+        lats = np.linspace(*box["lat"], grid_size)
+        lon_mesh, lat_mesh = np.meshgrid(lons, lats)  # rows = lat, cols = lon
+
+        X = pd.DataFrame(index=range(len(configs) * n_cells))
+        for col in feature_names:
+            if col == "LONGITUDE":
+                X[col] = np.tile(lon_mesh.ravel(), len(configs))
+            elif col == "LATITUDE":
+                X[col] = np.tile(lat_mesh.ravel(), len(configs))
+            else:
+                X[col] = np.repeat([cfg["features"][col] for cfg in configs], n_cells)
+        grid[ci] = model.predict(X).reshape(len(configs), grid_size, grid_size)
+
+    meta = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "grid_size": grid_size,
+        "shape": list(grid.shape),
+        "cities": boxes,
+        "configs": configs,
+    }
+    return grid, meta
+
+
+def save_surface(grid: np.ndarray, meta: dict, path: str = SURFACE_PATH, model_path: str = MODEL_PATH):
+    """Write the .npy and its .json atomically, tagged with the model they came from."""
+    from model_manager import file_sha256
+
+    meta = dict(meta, model_sha256=file_sha256(model_path) if os.path.exists(model_path) else None)
+    tmp_path = f"{path}.tmp-{os.getpid()}.npy"
+    np.save(tmp_path, grid)
+    os.replace(tmp_path, path)
+    tmp_meta = f"{meta_path(path)}.tmp-{os.getpid()}"
+    with open(tmp_meta, "w") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp_meta, meta_path(path))
+
+
+# ===================== LOOKUP ===========================
+
+class PriceSurface:
+    """
+    Memory-mapped price grid with bilinear interpolation.
+
+    Nothing is read into RAM up front; a lookup touches the four grid
+    cells around the point, so it costs the same however large the grid
+    is and needs no model.
+    """
+
+    def __init__(self, grid: np.ndarray, meta: dict):
+        self.grid = grid
+        self.meta = meta
+        self.cities = [b["city"] for b in meta["cities"]]
+        self.configs = meta["configs"]
+        self.model_sha256 = meta.get("model_sha256")
+        # (n_cities, 4): lon0, lon1, lat0, lat1
+        self._boxes = np.array([b["lon"] + b["lat"] for b in meta["cities"]], dtype=np.float64)
+        self._centres = np.column_stack([self._boxes[:, :2].mean(axis=1), self._boxes[:, 2:].mean(axis=1)])
+        self._bhk = np.array([c["features"]["BHK_NO."] for c in self.configs])
+
+    @classmethod
+    def load(cls, path: str = SURFACE_PATH) -> "PriceSurface":
+        with open(meta_path(path)) as fh:
+            meta = json.load(fh)
+        grid = np.load(path, mmap_mode="r")
+        if list(grid.shape) != meta["shape"]:
+            raise ValueError(f"{path} has shape {grid.shape}, metadata says {meta['shape']}")
+        return cls(grid, meta)
+
+    def city_at(self, lon: float, lat: float):
+        """Index of the city box containing the point (nearest centre on overlap), or None."""
+        b = self._boxes
+        inside = (b[:, 0] <= lon) & (lon <= b[:, 1]) & (b[:, 2] <= lat) & (lat <= b[:, 3])
+        if not inside.any():
+            return None
+        dist = np.where(inside, np.hypot(self._centres[:, 0] - lon, self._centres[:, 1] - lat), np.inf)
+        return int(np.argmin(dist))
+
+    def config_for(self, bhk_no: float) -> int:
+        return int(np.argmin(np.abs(self._bhk - bhk_no)))
+
+    def interpolate(self, city: int, config: int, lon, lat) -> np.ndarray:
+        """Bilinear price at each (lon, lat) in one city's grid; NaN outside its box."""
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        lon0, lon1, lat0, lat1 = self._boxes[city]
+        n = self.grid.shape[-1]
+        fx = (lon - lon0) / (lon1 - lon0) * (n - 1)
+        fy = (lat - lat0) / (lat1 - lat0) * (n - 1)
+        inside = (fx >= 0) & (fx <= n - 1) & (fy >= 0) & (fy <= n - 1)
+        ix = np.clip(np.floor(fx).astype(np.int64), 0, n - 2)
+        iy = np.clip(np.floor(fy).astype(np.int64), 0, n - 2)
+        tx, ty = fx - ix, fy - iy
+
+        g = self.grid[city, config]
+        price = ((g[iy, ix] * (1 - tx) + g[iy, ix + 1] * tx) * (1 - ty)
+                 + (g[iy + 1, ix] * (1 - tx) + g[iy + 1, ix + 1] * tx) * ty)
+        return np.where(inside, price, np.nan)
+
+    def lookup(self, lon: float, lat: float, bhk_no: float = 2):
+        """
+        "Typical price here": (city, config label, price in Lacs) for the
+        configuration closest to bhk_no, or None outside every city box.
+        """
+        city = self.city_at(lon, lat)
+        if city is None:
+            return None
+        config = self.config_for(bhk_no)
+        price = float(self.interpolate(city, config, lon, lat))
+        return self.cities[city], self.configs[config]["label"], price
+
+    def heatmap_frame(self, city: int, config: int, max_cells: int = 64) -> pd.DataFrame:
+        """
+        Long-format grid for a rect chart, thinned to max_cells per axis:
+        one row per cell with its lon/lat extent and price.
+        """
+        n = self.grid.shape[-1]
+        step = max(1, int(np.ceil(n / max_cells)))
+        lon0, lon1, lat0, lat1 = self._boxes[city]
+        lons = np.linspace(lon0, lon1, n)[::step]
+        lats = np.linspace(lat0, lat1, n)[::step]
+        d_lon = (lon1 - lon0) / (n - 1) * step
+        d_lat = (lat1 - lat0) / (n - 1) * step
+        prices = np.asarray(self.grid[city, config, ::step, ::step])
+        lon_mesh, lat_mesh = np.meshgrid(lons, lats)
+        return pd.DataFrame({
+            "Longitude": lon_mesh.ravel() - d_lon / 2,
+            "Longitude2": lon_mesh.ravel() + d_lon / 2,
+            "Latitude": lat_mesh.ravel() - d_lat / 2,
+            "Latitude2": lat_mesh.ravel() + d_lat / 2,
+            "Price (Lacs)": prices.ravel().astype(np.float64),
+        })
+
+
+def benchmark(surface: PriceSurface, model, n_points: int = 10_000, seed: int = 0):
+    """Lookup latency (scalar and vectorized) and interpolation error vs the model."""
+    rng = np.random.default_rng(seed)
+    city = rng.integers(0, len(surface.cities), n_points)
+    box = surface._boxes[city]
+    lon = rng.uniform(box[:, 0], box[:, 1])
+    lat = rng.uniform(box[:, 2], box[:, 3])
+    bhk = rng.choice(BHK_CONFIGS, n_points)
+
+    t0 = time.perf_counter()
+    for i in range(n_points):
+        surface.lookup(lon[i], lat[i], bhk[i])
+    scalar_us = (time.perf_counter() - t0) / n_points * 1e6
+
+    t0 = time.perf_counter()
+    surface.interpolate(0, 1, np.resize(lon, 1_000_000), np.resize(lat, 1_000_000))
+    vector_ns = (time.perf_counter() - t0) / 1_000_000 * 1e9
+
+    feature_names = list(model.feature_names_in_)
+    rows = []
+    for i in range(min(n_points, 2_000)):
+        c = surface.city_at(lon[i], lat[i])
+        k = surface.config_for(bhk[i])
+        rows.append(dict(surface.configs[k]["features"], LONGITUDE=lon[i], LATITUDE=lat[i], _c=c, _k=k))
+    rows = pd.DataFrame(rows)
+    one = rows[feature_names].iloc[:1]
+    model.predict(one)
+    t0 = time.perf_counter()
+    for _ in range(20):
+        model.predict(one)
+    model_ms = (time.perf_counter() - t0) / 20 * 1000
+
+    truth = model.predict(rows[feature_names])
+    approx = np.array([float(surface.interpolate(c, k, x, y))
+                       for c, k, x, y in zip(rows["_c"], rows["_k"], rows["LONGITUDE"], rows["LATITUDE"])])
+    rel = np.abs(approx - truth) / np.maximum(np.abs(truth), 1e-9)
+    return {
+        "scalar_lookup_us": scalar_us,
+        "vectorized_ns_per_point": vector_ns,
+        "model_single_row_ms": model_ms,
+        "median_rel_error": float(np.median(rel)),
+        "p90_rel_error": float(np.quantile(rel, 0.9)),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Precompute the per-city price surface for the app")
+    parser.add_argument("--grid", type=int, default=GRID_SIZE, help="grid points per axis")
+    parser.add_argument("--out", default=SURFACE_PATH)
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_PATH)
+    t0 = time.perf_counter()
+    grid, meta = build_surface(model, grid_size=args.grid)
+    build_s = time.perf_counter() - t0
+    save_surface(grid, meta, args.out)
+    n_evals = grid.size
+    print(f"🗺️ {len(meta['cities'])} cities × {len(meta['configs'])} configs × {args.grid}² grid: "
+          f"{n_evals:,} predictions in {build_s:.1f}s ({n_evals / build_s:,.0f}/s)")
+    print(f"💾 Saved {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB) + {meta_path(args.out)}")
+
+    t0 = time.perf_counter()
+    surface = PriceSurface.load(args.out)
+    load_ms = (time.perf_counter() - t0) * 1000
+    stats = benchmark(surface, model)
+    print(f"⚡ mmap load {load_ms:.1f} ms · lookup {stats['scalar_lookup_us']:.1f} µs/point "
+          f"(vectorized {stats['vectorized_ns_per_point']:.0f} ns/point) · "
+          f"single-row model.predict {stats['model_single_row_ms']:.1f} ms")
+    print(f"📏 Interpolation vs model: median error {stats['median_rel_error']:.1%}, "
+          f"p90 {stats['p90_rel_error']:.1%}")
@@ -0,0 +1,108 @@
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_COLS, MODEL_PATH
+
+# ===================== CONFIG ===========================
+
+SQFT_STEPS = 50
+SQFT_MIN, SQFT_MAX = 100, 10000
+BHK_SPAN = 2            # BHK counts either side of the submitted one
+BHK_MIN, BHK_MAX = 1, 10
+FLAG_COLS = ("READY_TO_MOVE", "RESALE")
+
+
+# ===================== GRID =============================
+
+def sqft_range(base_sqft: float, steps: int = SQFT_STEPS) -> np.ndarray:
+    """Half to double the current size, clipped to the form's limits."""
+    lo = max(SQFT_MIN, base_sqft * 0.5)
+    hi = min(SQFT_MAX, base_sqft * 2.0)
+    return np.linspace(lo, hi, steps)
+
+
+def bhk_range(base_bhk: int, span: int = BHK_SPAN) -> np.ndarray:
+    """The submitted BHK and up to `span` either side, clipped to the form's limits."""
+    base_bhk = int(base_bhk)
+    return np.arange(max(BHK_MIN, base_bhk - span), min(BHK_MAX, base_bhk + span) + 1)
+
+
+def build_grid(base_row: dict, sqft_values, bhk_values, flag_cols=FLAG_COLS,
+               feature_cols=FEATURE_COLS) -> np.ndarray:
+    """
+    Every (sqft, bhk, flags) combination as one float matrix.
+    Rows are ordered sqft-fastest, then bhk, then flag combination.
+    """
+    sqft_values = np.asarray(sqft_values, dtype=np.float64)
+    bhk_values = np.asarray(bhk_values, dtype=np.float64)
+    flags = np.array(list(itertools.product((0, 1), repeat=len(flag_cols))), dtype=np.float64)
+
+    n_sqft, n_bhk, n_flags = len(sqft_values), len(bhk_values), len(flags)
+    n = n_sqft * n_bhk * n_flags
+
+    base = np.array([float(base_row[c]) for c in feature_cols])
+    grid = np.tile(base, (n, 1))
+    col = {c: i for i, c in enumerate(feature_cols)}
+
+    grid[:, col["SQUARE_FT"]] = np.tile(sqft_values, n_bhk * n_flags)
+    grid[:, col["BHK_NO."]] = np.tile(np.repeat(bhk_values, n_sqft), n_flags)
+    flag_rows = np.repeat(flags, n_sqft * n_bhk, axis=0)
+    for k, c in enumerate(flag_cols):
+        grid[:, col[c]] = flag_rows[:, k]
+    if "READY_TO_MOVE" in flag_cols:
+        # the dataset never has a flat that is both ready and under construction
+        grid[:, col["UNDER_CONSTRUCTION"]] = 1 - grid[:, col["READY_TO_MOVE"]]
+    return grid
+
+
+# ===================== SWEEP ============================
+
+def sweep(model, base_row: dict, sqft_values=None, bhk_values=None, flag_cols=FLAG_COLS,
+          feature_cols=FEATURE_COLS):
+    """
+    Score the whole what-if grid with a single predict call.
+
+    Returns (results, elapsed_ms) where results has one row per grid point
+    with the varied columns and PRICE_LACS.
+    """
+    if sqft_values is None:
+        sqft_values = sqft_range(float(base_row["SQUARE_FT"]))
+    if bhk_values is None:
+        bhk_values = bhk_range(base_row["BHK_NO."])
+
+    t0 = time.perf_counter()
+    grid = build_grid(base_row, sqft_values, bhk_values, flag_cols, feature_cols)
+    X = pd.DataFrame(grid, columns=feature_cols)
+    prices = np.asarray(model.predict(X), dtype=np.float64)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    results = X[["SQUARE_FT", "BHK_NO.", *flag_cols]].copy()
+    results["BHK_NO."] = results["BHK_NO."].astype(int)
+    for c in flag_cols:
+        results[c] = results[c].astype(int)
+    results["PRICE_LACS"] = prices
+    return results, elapsed_ms
+
+
+def flag_label(row, flag_cols=FLAG_COLS) -> str:
+    names = {"READY_TO_MOVE": "Ready", "RESALE": "Resale", "RERA": "RERA"}
+    on = [names.get(c, c) for c in flag_cols if row[c]]
+    return " + ".join(on) if on else "None"
+
+
+if __name__ == "__main__":
+    import joblib
+
+    model = joblib.load(MODEL_PATH)
+    base = {
+        "POSTED_BY": 1, "UNDER_CONSTRUCTION": 0, "RERA": 1, "BHK_NO.": 2, "BHK_OR_RK": 0,
+        "SQUARE_FT": 1000, "READY_TO_MOVE": 1, "RESALE": 1, "LONGITUDE": 77.59, "LATITUDE": 12.97,
+    }
+    sweep(model, base)  # warm-up
+    timings = [sweep(model, base)[1] for _ in range(10)]
+    results, _ = sweep(model, base)
+    print(f"📈 {len(results)} grid points scored in one call: "
+          f"median {np.median(timings):.1f} ms, max {np.max(timings):.1f} ms")
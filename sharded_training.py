@@ -0,0 +1,274 @@
+import multiprocessing as mp
+import os
+import resource
+import shutil
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_cleaning import clean_dataset
+from features import DATA_PATH, MODEL_PATH, TARGET_COL, encode_features
+from geo_validation import validate_coordinates
+
+# ===================== CONFIG ===========================
+
+SHARD_DIR = "shards"
+CHUNK_ROWS = 100_000
+SAMPLE_ROWS = 50_000   # cleaned rows kept across all shards for the drift profile and price surface
+FOREST_PARAMS = {"max_depth": 12}
+
+
+# ===================== SHARDING =========================
+
+def write_shards(csv_path: str, out_dir: str, n_shards: int, chunk_rows: int = CHUNK_ROWS) -> list:
+    """
+    Stream the CSV and append each row to shard hash(row) % n_shards.
+
+    Only one chunk is in memory at a time. Identical rows always land in the
+    same shard, so the per-shard duplicate check is also a global one.
+    """
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+    paths = [os.path.join(out_dir, f"shard-{i:03d}.csv") for i in range(n_shards)]
+    started = [False] * n_shards
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+        chunk, _ = validate_coordinates(chunk, drop_invalid=True)  # row-local, safe per chunk
+        shard = pd.util.hash_pandas_object(chunk, index=False).to_numpy() % n_shards
+        for i in range(n_shards):
+            part = chunk[shard == i]
+            if len(part):
+                part.to_csv(paths[i], mode="a", header=not started[i], index=False)
+                started[i] = True
+    return [p for p, s in zip(paths, started) if s]
+
+
+# ===================== WORKER ===========================
+
+def _peak_rss_mb() -> float:
+    """
+    High-water RSS of this process's own address space.
+
+    VmHWM belongs to the current mm, so a spawned worker does not inherit the
+    parent's footprint. ru_maxrss (kB on Linux) is kept across fork/exec and
+    is only the fallback where /proc is not available.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fit_shard(shard_path: str, out_path: str, n_estimators: int, seed: int,
+              forest_params: dict = None, mem_limit_mb: int = None, sample_rows: int = 0) -> dict:
+    """
+    Clean, encode and fit one sub-forest on one shard, then pickle it.
+    With sample_rows, a random sample of the cleaned rows is written next
+    to it as CSV.
+
+    Takes only file paths and plain values, so the same call can run in a
+    local process (as here) or on another machine with shared storage.
+    """
+    from sklearn.ensemble import RandomForestRegressor
+
+    if mem_limit_mb:
+        limit = mem_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    t0 = time.perf_counter()
+    data = pd.read_csv(shard_path)
+    data, _ = clean_dataset(data)
+    X, y = encode_features(data), data[TARGET_COL]
+
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=seed, n_jobs=1,
+                                  **(forest_params or FOREST_PARAMS))
+    model.fit(X, y)
+    joblib.dump(model, out_path)
+
+    sample_path = None
+    if sample_rows:
+        sample_path = out_path.replace(".forest.pkl", ".sample.csv")
+        data.sample(min(sample_rows, len(data)), random_state=seed).to_csv(sample_path, index=False)
+    return {
+        "shard": os.path.basename(shard_path),
+        "rows": len(X),
+        "fit_s": time.perf_counter() - t0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "path": out_path,
+        "sample_path": sample_path,
+    }
+
+
+def _fit_shard_task(args):
+    return fit_shard(*args)
+
+
+# ===================== MERGING ==========================
+
+def merge_forests(paths: list):
+    """
+    Combine sub-forests into one RandomForestRegressor.
+    The forest mean over all trees equals the tree-count-weighted mean of
+    the sub-forests, so equal tree counts per shard weight shards equally.
+    """
+    merged = joblib.load(paths[0])
+    for path in paths[1:]:
+        other = joblib.load(path)
+        if list(other.feature_names_in_) != list(merged.feature_names_in_):
+            raise ValueError(f"{path} was trained on different features")
+        merged.estimators_ += other.estimators_
+    merged.n_estimators = len(merged.estimators_)
+    return merged
+
+
+def train_sharded(csv_path: str = DATA_PATH, n_shards: int = 4, total_trees: int = 50,
+                  n_workers: int = None, shard_dir: str = SHARD_DIR, forest_params: dict = None,
+                  mem_limit_mb: int = None, seed: int = 42, chunk_rows: int = CHUNK_ROWS,
+                  sample_rows: int = 0):
+    """
+    Shard the CSV, fit sub-forests in separate worker processes, merge.
+    Returns (merged_model, per-shard stats). With sample_rows, the shards
+    together keep about that many cleaned rows for load_samples().
+    """
+    if total_trees < n_shards:
+        raise ValueError(f"total_trees ({total_trees}) must be at least n_shards ({n_shards}), "
+                         f"otherwise some shards get no trees")
+    shard_paths = write_shards(csv_path, shard_dir, n_shards, chunk_rows)
+    per_shard = [total_trees // len(shard_paths)] * len(shard_paths)
+    for i in range(total_trees - sum(per_shard)):
+        per_shard[i] += 1
+
+    per_shard_sample = -(-sample_rows // len(shard_paths)) if sample_rows else 0  # shards are near-equal by hash
+    tasks = [
+        (path, path.replace(".csv", ".forest.pkl"), n_trees, seed + i, forest_params, mem_limit_mb,
+         per_shard_sample)
+        for i, (path, n_trees) in enumerate(zip(shard_paths, per_shard))
+    ]
+    # spawn + maxtasksperchild=1: every shard gets a fresh interpreter that does not
+    # share the parent's pages, so peak RSS is the shard's own
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(processes=n_workers or len(tasks), maxtasksperchild=1) as pool:
+        stats = pool.map(_fit_shard_task, tasks)
+
+    model = merge_forests([s["path"] for s in stats])
+    return model, stats
+
+
+def load_samples(stats: list) -> pd.DataFrame:
+    """The per-shard samples written by fit_shard, as one cleaned frame."""
+    return pd.concat([pd.read_csv(s["sample_path"]) for s in stats if s.get("sample_path")],
+                     ignore_index=True)
+
+
+def save_artifacts(model, sample: pd.DataFrame, model_path: str = MODEL_PATH):
+    """
+    Write the merged model together with the drift profile and price
+    surface built from it, in the same order as train_model.py: profile
+    first, then the model (which the app hot-swaps to), then the surface
+    tagged with the new model's hash. Both come from the cleaned row
+    sample, since the full dataset is never in memory here.
+
+    The canary set is not rewritten: a sharded run has no held-out rows,
+    so the app keeps checking new models against train_model.py's.
+    """
+    from drift_monitor import PROFILE_PATH, build_profile, save_profile
+    from model_manager import save_model_atomic
+    from price_surface import SURFACE_PATH, build_surface, save_surface
+
+    save_profile(build_profile(encode_features(sample)), PROFILE_PATH)
+    print(f"🛰️ Drift reference profile saved to {PROFILE_PATH} (from {len(sample):,} sampled rows)")
+
+    save_model_atomic(model, model_path, compress=3)
+    print(f"✅ Merged forest ({len(model.estimators_)} trees) saved to {model_path}")
+
+    grid, surface_meta = build_surface(model, sample)
+    save_surface(grid, surface_meta, SURFACE_PATH, model_path)
+    print(f"🗺️ Price surface saved to {SURFACE_PATH} ({len(surface_meta['cities'])} cities)")
+
+
+# ===================== BENCHMARK ========================
+
+def make_enlarged_csv(out_path: str, factor: int, csv_path: str = DATA_PATH, seed: int = 0):
+    """house_prices.csv repeated `factor` times with small jitter on size, price and location."""
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(csv_path)
+    header = True
+    for _ in range(factor):
+        copy = base.copy()
+        n = len(copy)
+        copy["SQUARE_FT"] = copy["SQUARE_FT"] * rng.uniform(0.95, 1.05, n)
+        copy[TARGET_COL] = copy[TARGET_COL] * rng.uniform(0.95, 1.05, n)
+        copy["LONGITUDE"] = copy["LONGITUDE"] + rng.normal(0, 0.01, n)
+        copy["LATITUDE"] = copy["LATITUDE"] + rng.normal(0, 0.01, n)
+        copy.to_csv(out_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+
+
+def benchmark(factor: int = 25, shard_counts=(1, 2, 4, 8), total_trees: int = 40):
+    import tempfile
+
+    from sklearn.metrics import r2_score
+    from sklearn.model_selection import train_test_split
+
+    tmp = tempfile.mkdtemp()
+    raw_train, raw_test = train_test_split(pd.read_csv(DATA_PATH), test_size=0.2, random_state=42)
+    train_csv = os.path.join(tmp, "house_prices_train.csv")
+    raw_train.to_csv(train_csv, index=False)
+    test, _ = validate_coordinates(raw_test, drop_invalid=True)
+    test, _ = clean_dataset(test)
+    X_test, y_test = encode_features(test), test[TARGET_COL]
+
+    big_csv = os.path.join(tmp, "house_prices_big.csv")
+    t0 = time.perf_counter()
+    make_enlarged_csv(big_csv, factor, csv_path=train_csv)
+    n_rows = sum(1 for _ in open(big_csv)) - 1
+    print(f"🧪 Synthetic dataset: {n_rows:,} rows ({os.path.getsize(big_csv) / 1e6:.0f} MB, "
+          f"built in {time.perf_counter() - t0:.1f}s), {total_trees} trees total, "
+          f"{os.cpu_count()} CPU(s)")
+
+    print(f"{'shards':>7}{'wall s':>9}{'sum fit s':>11}{'max shard fit s':>17}"
+          f"{'peak worker MB':>16}{'rows/shard':>12}{'R² (held-out)':>15}")
+    for n in shard_counts:
+        shard_dir = os.path.join(tmp, f"shards-{n}")
+        t0 = time.perf_counter()
+        model, stats = train_sharded(big_csv, n_shards=n, total_trees=total_trees, shard_dir=shard_dir)
+        wall = time.perf_counter() - t0
+        r2 = r2_score(y_test, model.predict(X_test))
+        print(f"{n:>7}{wall:>9.1f}{sum(s['fit_s'] for s in stats):>11.1f}"
+              f"{max(s['fit_s'] for s in stats):>17.1f}{max(s['peak_rss_mb'] for s in stats):>16.0f}"
+              f"{int(np.mean([s['rows'] for s in stats])):>12,}{r2:>15.3f}")
+        shutil.rmtree(shard_dir)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the forest on disk shards in separate processes")
+    parser.add_argument("--csv", default=DATA_PATH)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--trees", type=int, default=50, help="total trees across all shards")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--mem-limit-mb", type=int, default=None, help="address-space limit per worker")
+    parser.add_argument("--benchmark", action="store_true", help="scaling run on a 25x enlarged dataset")
+    args = parser.parse_args()
+    if args.trees < args.shards:
+        parser.error(f"--trees ({args.trees}) must be at least --shards ({args.shards})")
+
+    if args.benchmark:
+        benchmark()
+    else:
+        print(f"🧩 Training {args.trees} trees over {args.shards} shards of {args.csv}")
+        model, stats = train_sharded(args.csv, n_shards=args.shards, total_trees=args.trees,
+                                     n_workers=args.workers, mem_limit_mb=args.mem_limit_mb,
+                                     sample_rows=SAMPLE_ROWS)
+        for s in stats:
+            print(f"   {s['shard']}: {s['rows']:,} rows, {s['fit_s']:.1f}s, peak {s['peak_rss_mb']:.0f} MB")
+        save_artifacts(model, load_samples(stats))
+        shutil.rmtree(SHARD_DIR)
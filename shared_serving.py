@@ -0,0 +1,325 @@
+import json
+import multiprocessing as mp
+import os
+import signal
+import socket
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from features import MODEL_PATH
+from flat_forest import ARRAY_NAMES, FlatForest, flatten_forest
+
+# ===================== CONFIG ===========================
+
+HOST = "127.0.0.1"
+PORT = 8600
+RESTART_BACKOFF_S = 0.5
+
+
+# ===================== SHARED MODEL =====================
+
+class SharedModel:
+    """
+    Flat forest arrays packed into one SharedMemory block.
+
+    The parent calls SharedModel.create(model). Workers call
+    SharedModel.attach(spec) and get NumPy views straight onto the shared
+    pages, so there is one physical copy of the trees however many workers run.
+    """
+
+    def __init__(self, shm, spec: dict):
+        self.shm = shm
+        self.spec = spec
+        arrays = {}
+        for name, (offset, dtype, shape) in spec["layout"].items():
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        arrays["max_depth"] = spec["max_depth"]
+        arrays["feature_names"] = spec["feature_names"]
+        self.forest = FlatForest(arrays)
+
+    @classmethod
+    def create(cls, model) -> "SharedModel":
+        flat = flatten_forest(model)
+        layout, offset = {}, 0
+        for name in ARRAY_NAMES:
+            arr = flat[name]
+            offset = (offset + 63) // 64 * 64  # keep every array aligned
+            layout[name] = (offset, arr.dtype.str, arr.shape)
+            offset += arr.nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name in ARRAY_NAMES:
+            start, dtype, shape = layout[name]
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+            view[...] = flat[name]
+
+        spec = {
+            "name": shm.name,
+            "layout": layout,
+            "max_depth": flat["max_depth"],
+            "feature_names": flat["feature_names"],
+        }
+        return cls(shm, spec)
+
+    @classmethod
+    def attach(cls, spec: dict) -> "SharedModel":
+        # the parent owns the block, workers must not unlink it on exit
+        try:
+            shm = shared_memory.SharedMemory(name=spec["name"], track=False)
+        except TypeError:  # Python < 3.13: children share the parent's tracker
+            shm = shared_memory.SharedMemory(name=spec["name"])
+        return cls(shm, spec)
+
+    def predict(self, X) -> np.ndarray:
+        return self.forest.predict(X)
+
+    def close(self, unlink: bool = False):
+        self.forest = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# ===================== HTTP WORKER ======================
+
+def _make_handler(predict_fn, feature_names):
+    class PredictHandler(BaseHTTPRequestHandler):
+        # one request per connection, so a single worker is never pinned
+        # to one keep-alive client
+        protocol_version = "HTTP/1.0"
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                rows = json.loads(self.rfile.read(length))["rows"]
+                X = np.array([[row[c] for c in feature_names] for row in rows], dtype=np.float64)
+                prices = predict_fn(X).tolist()
+                body = json.dumps({"prices": prices, "pid": os.getpid()}).encode("utf-8")
+                self.send_response(200)
+            except (KeyError, ValueError, TypeError) as exc:
+                body = json.dumps({"error": str(exc)}).encode("utf-8")
+                self.send_response(400)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            body = json.dumps({"status": "ok", "pid": os.getpid()}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PredictHandler
+
+
+class _WorkerServer(HTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # clients hanging up mid-response are not worth a traceback
+
+
+def _serve(sock: socket.socket, ready, predict_fn, feature_names):
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    server = _WorkerServer(sock.getsockname(), _make_handler(predict_fn, feature_names), bind_and_activate=False)
+    server.socket = sock  # every worker accepts on the parent's socket
+    ready.put(os.getpid())
+    server.serve_forever()
+
+
+def shared_worker(sock: socket.socket, ready, spec: dict):
+    """Worker that predicts from the parent's shared-memory forest."""
+    shared = SharedModel.attach(spec)
+    _serve(sock, ready, shared.predict, spec["feature_names"])
+
+
+def private_worker(sock: socket.socket, ready, model_path: str):
+    """Baseline worker that unpickles its own copy, like load_model() does."""
+    import joblib
+
+    model = joblib.load(model_path)
+    feature_names = list(model.feature_names_in_)
+    _serve(sock, ready, lambda X: model.predict(_as_frame(X, feature_names)), feature_names)
+
+
+def _as_frame(X, feature_names):
+    import pandas as pd
+
+    return pd.DataFrame(X, columns=feature_names)
+
+
+# ===================== SUPERVISOR =======================
+
+class Supervisor:
+    """
+    Pre-fork supervisor: binds one listening socket, forks n workers that
+    all accept on it, and restarts any worker that dies.
+    """
+
+    def __init__(self, n_workers: int, mode: str = "shared", model_path: str = MODEL_PATH,
+                 host: str = HOST, port: int = PORT):
+        self.n_workers = n_workers
+        self.mode = mode
+        self.model_path = model_path
+        self.ctx = mp.get_context("fork")
+        self.workers = []
+        self.restarts = 0
+        self.shared = None
+        self.ready = self.ctx.Queue()
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(256)
+        self.address = self.sock.getsockname()
+
+    def _spawn(self):
+        if self.mode == "shared":
+            target, args = shared_worker, (self.sock, self.ready, self.shared.spec)
+        else:
+            target, args = private_worker, (self.sock, self.ready, self.model_path)
+        proc = self.ctx.Process(target=target, args=args, daemon=True)
+        proc.start()
+        return proc
+
+    def start(self):
+        if self.mode == "shared":
+            import joblib
+
+            self.shared = SharedModel.create(joblib.load(self.model_path))
+        self.workers = [self._spawn() for _ in range(self.n_workers)]
+        return self
+
+    def wait_ready(self, timeout_s: float = 300.0):
+        """Block until every initial worker has loaded its model."""
+        for _ in range(self.n_workers):
+            self.ready.get(timeout=timeout_s)
+
+    def check(self) -> int:
+        """Restart dead workers. Returns how many were restarted."""
+        restarted = 0
+        for i, proc in enumerate(self.workers):
+            if not proc.is_alive():
+                proc.join(timeout=0)
+                self.workers[i] = self._spawn()
+                restarted += 1
+        self.restarts += restarted
+        return restarted
+
+    def run_forever(self):
+        try:
+            while True:
+                if self.check():
+                    print(f"♻️ Restarted workers (total restarts: {self.restarts})")
+                time.sleep(RESTART_BACKOFF_S)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def pids(self):
+        return [p.pid for p in self.workers]
+
+    def stop(self):
+        for proc in self.workers:
+            if proc.is_alive():
+                proc.terminate()
+        for proc in self.workers:
+            proc.join(timeout=5)
+        self.sock.close()
+        if self.shared is not None:
+            self.shared.close(unlink=True)
+            self.shared = None
+
+
+# ===================== BENCHMARK ========================
+
+def _mem_kb(pid: int, field: str) -> int:
+    """Read Rss or Pss (kB) from /proc/<pid>/smaps_rollup (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as fh:
+            for line in fh:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _client_loop(address, rows, duration_s, out_queue):
+    import http.client
+
+    body = json.dumps({"rows": rows}).encode("utf-8")
+    done = 0
+    deadline = time.perf_counter() + duration_s
+    while time.perf_counter() < deadline:
+        conn = http.client.HTTPConnection(*address)
+        conn.request("POST", "/predict", body, {"Content-Type": "application/json"})
+        conn.getresponse().read()
+        conn.close()
+        done += 1
+    out_queue.put(done)
+
+
+def benchmark(worker_counts=(1, 4, 16), modes=("private", "shared"), duration_s=5.0,
+              n_clients=16, batch_rows=1):
+    import pandas as pd
+
+    from features import encode_features
+    from geo_validation import validate_coordinates
+
+    data, _ = validate_coordinates(pd.read_csv("house_prices.csv"), drop_invalid=True)
+    sample = encode_features(data.sample(batch_rows, random_state=0))
+    rows = json.loads(sample.to_json(orient="records"))
+
+    ctx = mp.get_context("fork")
+    print(f"{'mode':<8}{'workers':>8}{'RSS MB':>10}{'PSS MB':>10}{'req/s':>10}")
+    for mode in modes:
+        for n in worker_counts:
+            sup = Supervisor(n, mode=mode, port=0).start()
+            try:
+                sup.wait_ready()
+
+                queue = ctx.Queue()
+                clients = [ctx.Process(target=_client_loop, args=(sup.address, rows, duration_s, queue))
+                           for _ in range(n_clients)]
+                for c in clients:
+                    c.start()
+                total = sum(queue.get() for _ in clients)
+                for c in clients:
+                    c.join()
+
+                pids = [os.getpid()] + sup.pids()
+                rss = sum(_mem_kb(p, "Rss") for p in pids) / 1024
+                pss = sum(_mem_kb(p, "Pss") for p in pids) / 1024
+                print(f"{mode:<8}{n:>8}{rss:>10.1f}{pss:>10.1f}{total / duration_s:>10.1f}")
+            finally:
+                sup.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Multi-process model server with a shared forest")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--mode", choices=["shared", "private"], default="shared")
+    parser.add_argument("--benchmark", action="store_true", help="measure RSS/PSS and throughput at 1, 4, 16 workers")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        sup = Supervisor(args.workers, mode=args.mode, port=args.port).start()
+        print(f"🚀 Serving on http://{sup.address[0]}:{sup.address[1]}/predict with {args.workers} {args.mode} workers")
+        sup.run_forever()
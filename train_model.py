@@ -2,54 +2,54 @@ import os
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
-import joblib
+
+from geo_validation import validate_coordinates, format_report
+from data_cleaning import clean_dataset, duplicate_mask, format_report as format_clean_report
+from model_manager import CANARY_PATH, save_model_atomic
+from drift_monitor import PROFILE_PATH, build_profile, save_profile
+from price_surface import SURFACE_PATH, build_surface, save_surface
+from features import DATA_PATH, FEATURE_COLS, MODEL_PATH, TARGET_COL, encode_features
 
 # 1. Load your dataset
-# Make sure this CSV file exists in the same folder as this script
-DATA_PATH = "house_prices.csv"   # change if your file name is different
+# Make sure this CSV file (features.DATA_PATH) exists in the same folder as this script
 
 print(f"📂 Loading data from: {DATA_PATH}")
 data = pd.read_csv(DATA_PATH)
 print("✅ Data loaded.")
 print("Columns:", list(data.columns))
 
+# 1b. Coordinate sanity check
+# LONGITUDE / LATITUDE are swapped in the raw CSV; fix them and drop
+# points that fall outside India so training matches what the app sends.
+data, coord_report = validate_coordinates(data, drop_invalid=True)
+print("🧭 Coordinate check:", format_report(coord_report))
+
+# 1c. Drop duplicate listings before the split, so no listing is in both parts
+dup = duplicate_mask(data, list(data.columns))
+data = data[~dup]
+print(f"🧹 Dropped {int(dup.sum())} duplicate listings")
+
+# 1d. Train-test split, then remove price/sqft outliers from the training
+# part only; the test set keeps every row so R² stays comparable
+train_data, test_data = train_test_split(data, test_size=0.2, random_state=42)
+train_data, clean_report = clean_dataset(train_data)
+print("🧹 Cleaning (train only):", format_clean_report(clean_report))
+
 # 2. Features (X) and Target (y)
-# We will use the same features that app_web.py expects:
-# POSTED_BY, UNDER_CONSTRUCTION, RERA, BHK_NO., BHK_OR_RK,
-# SQUARE_FT, READY_TO_MOVE, RESALE, LONGITUDE, LATITUDE
-
-feature_cols = [
-    "POSTED_BY",
-    "UNDER_CONSTRUCTION",
-    "RERA",
-    "BHK_NO.",
-    "BHK_OR_RK",
-    "SQUARE_FT",
-    "READY_TO_MOVE",
-    "RESALE",
-    "LONGITUDE",
-    "LATITUDE",
-]
-
-target_col = "TARGET(PRICE_IN_LACS)"
-
-X = data[feature_cols].copy()
-y = data[target_col]
-
-# 3. Encode simple categorical columns
-# POSTED_BY and BHK_OR_RK are objects (string), convert to category codes
-if X["POSTED_BY"].dtype == "object":
-    X["POSTED_BY"] = X["POSTED_BY"].astype("category").cat.codes
-
-if X["BHK_OR_RK"].dtype == "object":
-    X["BHK_OR_RK"] = X["BHK_OR_RK"].astype("category").cat.codes
-
-print("✅ Encoded categorical columns.")
-
-# 4. Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+# The same features.FEATURE_COLS the app and batch pricing send
+target_col = TARGET_COL
+
+# 3. Encode POSTED_BY / BHK_OR_RK with the fixed codes from features.py,
+# so a category missing after cleaning cannot shift the codes away from
+# what the app sends at prediction time
+X_train, y_train = encode_features(train_data), train_data[target_col]
+X_test, y_test = encode_features(test_data), test_data[target_col]
+for name, X_part in (("train", X_train), ("test", X_test)):
+    unknown = X_part[["POSTED_BY", "BHK_OR_RK"]].isna().any(axis=1)
+    if unknown.any():
+        raise ValueError(f"{int(unknown.sum())} {name} rows have a POSTED_BY/BHK_OR_RK value "
+                         f"without a code in features.py")
+print("✅ Encoded categorical columns:", ", ".join(FEATURE_COLS))
 
 print("📊 Train size:", X_train.shape, " Test size:", X_test.shape)
 
@@ -69,15 +69,29 @@ print("✅ Training done.")
 score = model.score(X_test, y_test)
 print(f"📈 R² score on test set: {score:.4f}")
 
-# 6. Save model with compression
-MODEL_PATH = "house_price_model.pkl"
+# 6. Save a held-out canary set; the app checks new models against it
+canary = X_test.sample(min(500, len(X_test)), random_state=42)
+canary.assign(**{target_col: y_test.loc[canary.index]}).to_csv(CANARY_PATH, index=False)
+print(f"🐤 Canary set saved to {CANARY_PATH} ({len(canary)} rows)")
+
+# Reference feature profile for the app's drift monitor
+save_profile(build_profile(X_train), PROFILE_PATH)
+print(f"🛰️ Drift reference profile saved to {PROFILE_PATH}")
+
+# 7. Save model with compression
+# written atomically so a running app never loads a half-written file
 print("💾 Saving compressed model...")
-joblib.dump(model, MODEL_PATH, compress=3)
+save_model_atomic(model, MODEL_PATH, compress=3)
 
-# 7. Show final file size
+# 8. Show final file size
 size_bytes = os.path.getsize(MODEL_PATH)
 size_mb = size_bytes / (1024 * 1024)
 print(f"✅ Model saved to {MODEL_PATH}")
 print(f"📦 File size: {size_mb:.2f} MB")
 
+# 9. Precompute the per-city price surface the app uses for its heatmap
+grid, surface_meta = build_surface(model, data)
+save_surface(grid, surface_meta, SURFACE_PATH, MODEL_PATH)
+print(f"🗺️ Price surface saved to {SURFACE_PATH} ({len(surface_meta['cities'])} cities)")
+
 